@@ -0,0 +1,6 @@
+"""Fortune Teller backend"""
+
+from dotenv import load_dotenv
+
+# Load .env once, before any backend module reads its settings
+load_dotenv()
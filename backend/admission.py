@@ -0,0 +1,202 @@
+"""Admission control for chat requests: per-user token buckets and a bounded wait queue"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Hashable
+
+from fastapi import HTTPException, status
+
+from backend import metrics
+from backend.cache import TTLCache
+
+# Concurrency limit and wait queue (per process)
+CHAT_MAX_CONCURRENT = int(os.getenv("CHAT_MAX_CONCURRENT", os.getenv("LLM_MAX_IN_FLIGHT", "64")))
+CHAT_QUEUE_LIMIT = int(os.getenv("CHAT_QUEUE_LIMIT", "128"))
+CHAT_QUEUE_TIMEOUT = float(os.getenv("CHAT_QUEUE_TIMEOUT", "10"))  # seconds a request may wait
+
+# Per-user fair share: a bucket of CHAT_USER_BURST tokens refilled at
+# CHAT_USER_RATE_PER_MINUTE; a rate of 0 turns the buckets off
+CHAT_USER_RATE_PER_MINUTE = float(os.getenv("CHAT_USER_RATE_PER_MINUTE", "20"))
+CHAT_USER_BURST = int(os.getenv("CHAT_USER_BURST", "5"))
+CHAT_USER_BUCKETS = int(os.getenv("CHAT_USER_BUCKETS", "10000"))
+
+admission_rejections = metrics.registry.counter(
+    "chat_admission_rejections_total", "Chat requests turned away by admission control", ("reason",)
+)
+
+
+class TokenBucket:
+    """Refilling allowance of requests for one user"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate  # tokens per second
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; return 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class Rejected(HTTPException):
+    """HTTP error raised when a chat request is not admitted"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float):
+        super().__init__(
+            status_code=status_code,
+            detail=detail,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+class Ticket:
+    """A granted slot; release() is safe to call more than once"""
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._started = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._controller._release(time.monotonic() - self._started)
+
+
+class AdmissionController:
+    """Caps concurrent chats, queues a bounded number of waiters in FIFO order,
+    and rejects fast with Retry-After when a user or the process is over its limit"""
+
+    def __init__(self, limit: int, queue_limit: int, queue_timeout: float,
+                 user_rate_per_minute: float, user_burst: int, max_buckets: int):
+        self.limit = limit
+        self.queue_limit = queue_limit
+        self.queue_timeout = queue_timeout
+        self.user_rate = user_rate_per_minute / 60
+        self.user_burst = user_burst
+        # A bucket idle long enough to refill completely is the same as a new one
+        refill_time = user_burst / self.user_rate if self.user_rate > 0 else 0
+        self._buckets = TTLCache(max_buckets, refill_time)
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.active = 0
+        self.admitted = 0
+        self.rejected = {"rate_limited": 0, "queue_full": 0, "queue_timeout": 0}
+        self._avg_hold = 1.0  # moving average of seconds a slot is held
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def _reject(self, reason: str, status_code: int, detail: str, retry_after: float) -> Rejected:
+        self.rejected[reason] += 1
+        admission_rejections.inc(reason)
+        return Rejected(status_code, detail, retry_after)
+
+    def _expected_wait(self) -> float:
+        """Rough seconds until a newly queued request would get a slot"""
+        return self._avg_hold * (self.queue_depth + 1) / max(1, self.limit)
+
+    def check_user(self, user_key: Hashable):
+        """Spend one of the user's tokens or raise 429"""
+        if self.user_rate <= 0:
+            return
+        bucket = self._buckets.get(user_key)
+        if bucket is None:
+            bucket = TokenBucket(self.user_rate, self.user_burst)
+        wait = bucket.take()
+        self._buckets.set(user_key, bucket)
+        if wait:
+            raise self._reject(
+                "rate_limited", status.HTTP_429_TOO_MANY_REQUESTS,
+                "You are sending messages too quickly, please wait a moment", wait
+            )
+
+    async def admit(self) -> Ticket:
+        """Wait for a chat slot, or raise 503 with Retry-After"""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return Ticket(self)
+
+        if len(self._waiters) >= self.queue_limit:
+            raise self._reject(
+                "queue_full", status.HTTP_503_SERVICE_UNAVAILABLE,
+                "The fortune teller is busy, please try again shortly", self._expected_wait()
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done():
+                # The slot was handed over just as we gave up; pass it on
+                self._release_slot()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise self._reject(
+                "queue_timeout", status.HTTP_503_SERVICE_UNAVAILABLE,
+                "The fortune teller is busy, please try again shortly", self._expected_wait()
+            )
+
+        # The releasing request handed its slot straight to us
+        self.admitted += 1
+        return Ticket(self)
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a chat slot for the duration of the block"""
+        ticket = await self.admit()
+        try:
+            yield ticket
+        finally:
+            ticket.release()
+
+    def _release(self, held: float):
+        self._avg_hold = 0.9 * self._avg_hold + 0.1 * held
+        self._release_slot()
+
+    def _release_slot(self):
+        # Hand the slot to the oldest waiter still waiting, or free it
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        """Current load and admission counters"""
+        return {
+            "active": self.active,
+            "limit": self.limit,
+            "queue_depth": self.queue_depth,
+            "queue_limit": self.queue_limit,
+            "admitted": self.admitted,
+            "rejected": dict(self.rejected),
+            "avg_hold_seconds": round(self._avg_hold, 3),
+        }
+
+
+# Shared controller for this process
+chat_admission = AdmissionController(
+    CHAT_MAX_CONCURRENT, CHAT_QUEUE_LIMIT, CHAT_QUEUE_TIMEOUT,
+    CHAT_USER_RATE_PER_MINUTE, CHAT_USER_BURST, CHAT_USER_BUCKETS,
+)
+
+metrics.registry.gauge("chat_queue_depth", "Chat requests waiting for a slot", lambda: chat_admission.queue_depth)
+metrics.registry.gauge("chat_active", "Chat requests holding a slot", lambda: chat_admission.active)
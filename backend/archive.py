@@ -0,0 +1,289 @@
+"""Cold storage for chat messages of inactive sessions"""
+
+import asyncio
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend import metrics
+from backend.database import AsyncSessionLocal
+from backend.models import ChatArchive, ChatMessage, ChatSession, ChatSummary
+
+try:
+    import zstandard  # optional: pip install zstandard
+except ImportError:
+    zstandard = None
+
+# Archival settings
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "true").lower() == "true"
+ARCHIVE_AFTER_DAYS = float(os.getenv("ARCHIVE_AFTER_DAYS", "30"))  # inactivity before a session is archived
+ARCHIVE_INTERVAL = float(os.getenv("ARCHIVE_INTERVAL", "3600"))  # seconds between runs
+ARCHIVE_BATCH_SESSIONS = int(os.getenv("ARCHIVE_BATCH_SESSIONS", "50"))  # sessions per transaction batch
+ARCHIVE_PAUSE = float(os.getenv("ARCHIVE_PAUSE", "0.1"))  # seconds between batches
+
+DEFAULT_CODEC = "zstd" if zstandard is not None else "zlib"
+
+messages_archived = metrics.registry.counter(
+    "chat_messages_archived_total", "Chat messages moved to cold storage"
+)
+messages_rehydrated = metrics.registry.counter(
+    "chat_messages_rehydrated_total", "Archived chat messages restored when a session resumed"
+)
+
+
+def compress(data: bytes, codec: str = DEFAULT_CODEC) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return zlib.compress(data, 9)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("This archive is zstd-compressed; install zstandard to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+def encode_messages(rows) -> bytes:
+    """JSON lines of (id, role, content, created_at)"""
+    return "\n".join(
+        json.dumps({"id": id, "role": role, "content": content, "created_at": created_at.isoformat()})
+        for id, role, content, created_at in rows
+    ).encode("utf-8")
+
+
+def decode_messages(archive: ChatArchive) -> List[dict]:
+    lines = decompress(archive.payload, archive.codec).decode("utf-8").splitlines()
+    return [json.loads(line) for line in lines if line]
+
+
+async def archived_messages(
+    db: AsyncSession, session_pk: int, before: Optional[Tuple[datetime, int]], limit: int,
+    since: Optional[datetime] = None
+) -> List[dict]:
+    """Newest archived messages of a session before a (created_at, id) cursor, newest
+    first, read without restoring them. Segments that end before `since` are skipped."""
+    query = (
+        select(ChatArchive.id, ChatArchive.last_message_at)
+        .filter(ChatArchive.session_id == session_pk)
+        .order_by(ChatArchive.last_message_at.desc(), ChatArchive.id.desc())
+    )
+    if before:
+        # Segments that start after the cursor hold nothing older than it
+        query = query.filter(ChatArchive.first_message_at <= before[0])
+    if since:
+        query = query.filter(ChatArchive.last_message_at >= since)
+
+    messages = []
+    for archive_id, last_message_at in (await db.execute(query)).all():
+        # Newest segments first; once the page is full, the rest end before it
+        if len(messages) >= limit and last_message_at < messages[limit - 1]["created_at"]:
+            break
+        archive = await db.get(ChatArchive, archive_id)
+        for message in decode_messages(archive):
+            message["created_at"] = datetime.fromisoformat(message["created_at"])
+            if before is None or (message["created_at"], message["id"]) < before:
+                messages.append(message)
+        messages.sort(key=lambda message: (message["created_at"], message["id"]), reverse=True)
+    return messages[:limit]
+
+
+async def archive_session(
+    db: AsyncSession, session_pk: int, user_id: int, cutoff: Optional[datetime] = None
+) -> Optional[int]:
+    """Move a session's hot messages into one compressed segment, returning how many moved,
+    or None if another run moved some of them first; the caller must then roll back.
+    A session with a message at or after `cutoff` is active again and left alone."""
+    rows = (await db.execute(
+        select(ChatMessage.id, ChatMessage.role, ChatMessage.content, ChatMessage.created_at)
+        .filter(ChatMessage.session_id == session_pk)
+        .order_by(ChatMessage.created_at, ChatMessage.id)
+    )).all()
+    if not rows or (cutoff is not None and rows[-1].created_at >= cutoff):
+        return 0
+
+    # Delete first: only the rows read above, so a message arriving meanwhile stays hot,
+    # and rows a concurrent run already archived are missing from the count
+    deleted = await db.execute(delete(ChatMessage).filter(
+        ChatMessage.session_id == session_pk,
+        ChatMessage.id.in_([row.id for row in rows])
+    ).execution_options(synchronize_session=False))
+    if deleted.rowcount != len(rows):
+        return None
+
+    db.add(ChatArchive(
+        session_id=session_pk,
+        user_id=user_id,
+        codec=DEFAULT_CODEC,
+        payload=compress(encode_messages(rows)),
+        message_count=len(rows),
+        first_message_at=rows[0].created_at,
+        last_message_at=rows[-1].created_at,
+    ))
+    return len(rows)
+
+
+async def rehydrate_session(db: AsyncSession, session_pk: int, summarized_until_id: int = 0) -> Optional[int]:
+    """Move an archived session's messages back into the hot table and commit.
+
+    Restored messages get new ids, so the summary's watermark is remapped to
+    them. Returns the new watermark, or None if nothing was archived.
+    """
+    archives = (await db.scalars(
+        select(ChatArchive).filter(ChatArchive.session_id == session_pk).order_by(ChatArchive.id)
+    )).all()
+    if not archives:
+        return None
+    segments = [decode_messages(archive) for archive in archives]
+
+    # Claim the segments first; if a concurrent resume restored them, use its result
+    deleted = await db.execute(
+        delete(ChatArchive)
+        .filter(ChatArchive.id.in_([archive.id for archive in archives]))
+        .execution_options(synchronize_session=False)
+    )
+    if deleted.rowcount != len(archives):
+        await db.rollback()
+        return await db.scalar(
+            select(ChatSummary.summarized_until_id).filter(ChatSummary.session_id == session_pk)
+        ) or 0
+
+    restored = []
+    for messages in segments:
+        for message in messages:
+            restored.append((message["id"], ChatMessage(
+                session_id=session_pk,
+                role=message["role"],
+                content=message["content"],
+                created_at=datetime.fromisoformat(message["created_at"]),
+            )))
+    restored.sort(key=lambda item: (item[1].created_at, item[0]))
+
+    # Messages that arrived while the session was being archived are moved behind
+    # the restored ones, so ids stay in chronological order. They are newer than
+    # anything archived and count as not yet summarized (SQLite may even have
+    # reused an archived id for them).
+    hot = (await db.execute(
+        select(ChatMessage.id, ChatMessage.role, ChatMessage.content, ChatMessage.created_at)
+        .filter(ChatMessage.session_id == session_pk)
+        .order_by(ChatMessage.created_at, ChatMessage.id)
+    )).all()
+    if hot:
+        await db.execute(delete(ChatMessage).filter(
+            ChatMessage.id.in_([row.id for row in hot])
+        ).execution_options(synchronize_session=False))
+    db.add_all([message for _, message in restored])
+    db.add_all([
+        ChatMessage(session_id=session_pk, role=row.role, content=row.content, created_at=row.created_at)
+        for row in hot
+    ])
+    await db.flush()
+
+    # The newest restored message that was already summarized
+    summarized_until_id = max(
+        (message.id for old_id, message in restored if old_id <= summarized_until_id),
+        default=0,
+    )
+    await db.execute(
+        update(ChatSummary)
+        .filter(ChatSummary.session_id == session_pk)
+        .values(summarized_until_id=summarized_until_id)
+    )
+    await db.commit()
+    messages_rehydrated.inc(amount=len(restored))
+    print(f"🗄️  Restored {len(restored)} archived messages for chat session {session_pk}")
+    return summarized_until_id
+
+
+class ArchiveJob:
+    """Periodically moves messages of sessions idle for ARCHIVE_AFTER_DAYS to cold storage"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.sessions_archived = 0
+        self.messages_archived = 0
+
+    def start(self):
+        """Start the archive loop on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the archive loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"❌ Chat archive error: {str(e)}")
+            await asyncio.sleep(ARCHIVE_INTERVAL)
+
+    async def run_once(self, now: Optional[datetime] = None) -> int:
+        """Archive every inactive session, returning how many messages were moved"""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=ARCHIVE_AFTER_DAYS)
+        moved = 0
+        async with AsyncSessionLocal() as db:
+            # Sessions whose newest hot message is older than the cutoff, found once
+            # per pass from the (session_id, created_at) index
+            pending = (await db.execute(
+                select(ChatMessage.session_id, ChatSession.user_id)
+                .join(ChatSession, ChatSession.id == ChatMessage.session_id)
+                .group_by(ChatMessage.session_id, ChatSession.user_id)
+                .having(func.max(ChatMessage.created_at) < cutoff)
+            )).all()
+
+        for start in range(0, len(pending), ARCHIVE_BATCH_SESSIONS):
+            if start:
+                await asyncio.sleep(ARCHIVE_PAUSE)
+            idle = pending[start:start + ARCHIVE_BATCH_SESSIONS]
+            async with AsyncSessionLocal() as db:
+                counts = []
+                for session_pk, user_id in idle:
+                    count = await archive_session(db, session_pk, user_id, cutoff)
+                    if count is None:
+                        break
+                    counts.append(count)
+                if len(counts) < len(idle):
+                    # Another run is archiving the same sessions; leave them to it
+                    await db.rollback()
+                    print("🗄️  Another chat archive run is in progress, stopping this one")
+                    break
+                await db.commit()
+
+            moved += sum(counts)
+            self.sessions_archived += sum(1 for count in counts if count)
+
+        self.runs += 1
+        self.messages_archived += moved
+        if moved:
+            messages_archived.inc(amount=moved)
+            print(f"🗄️  Archived {moved} chat messages from inactive sessions")
+        return moved
+
+    def stats(self) -> dict:
+        """Archive counters for monitoring"""
+        return {
+            "codec": DEFAULT_CODEC,
+            "runs": self.runs,
+            "sessions_archived": self.sessions_archived,
+            "messages_archived": self.messages_archived,
+        }
+
+
+# Shared archive job for this process
+archive_job = ArchiveJob()
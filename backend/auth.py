@@ -1,31 +1,56 @@
 """Authentication utilities"""
 
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import os
-from dotenv import load_dotenv
 
-from backend.database import get_db
+from backend import metrics
+from backend.cache import TTLCache
+from backend.database import get_async_db
 from backend.models import User
 
-load_dotenv()
-
 # Secret key for JWT
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing - hashes below BCRYPT_ROUNDS are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=BCRYPT_ROUNDS,
+    bcrypt__min_rounds=BCRYPT_ROUNDS,
+)
+
+# Worker pool that keeps bcrypt off the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "32"))
+
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_pending = 0
 
 # HTTP Bearer token
 security = HTTPBearer()
 
+# Caches for verified tokens and user rows, so authenticated requests skip the DB
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "10000"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "60"))  # seconds
+token_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+user_cache = TTLCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+
+# User columns kept in the cache (the password hash is deliberately left out)
+CACHED_USER_FIELDS = ("id", "username", "email", "is_verified", "created_at")
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
@@ -37,6 +62,46 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt"
+        )
+    return _hash_executor
+
+
+async def _run_in_hash_pool(operation: str, func, *args):
+    """Run a bcrypt operation in the worker pool, rejecting work beyond the queue limit"""
+    global _hash_pending
+    if _hash_pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_LIMIT:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    
+    _hash_pending += 1
+    try:
+        with metrics.password_hash_duration.time(operation):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_get_hash_executor(), func, *args)
+    finally:
+        _hash_pending -= 1
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password without blocking the event loop"""
+    return await _run_in_hash_pool("hash", pwd_context.hash, password)
+
+
+async def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password off the event loop, returning a new hash if the old cost is outdated"""
+    return await _run_in_hash_pool("verify", pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -63,13 +128,29 @@ def decode_token(token: str) -> dict:
         )
 
 
+def invalidate_user(username: str):
+    """Drop a cached user row after the user was modified"""
+    user_cache.pop(username)
+
+
+def auth_cache_stats() -> dict:
+    """Hit-rate counters for the token and user caches"""
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     """Get the current authenticated user"""
     token = credentials.credentials
-    payload = decode_token(token)
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = decode_token(token)
+        # Never cache a token past its own expiry
+        ttl = payload.get("exp", 0) - time.time()
+        if ttl > 0:
+            token_cache.set(token, payload, ttl=ttl)
     
     username: str = payload.get("sub")
     if username is None:
@@ -78,12 +159,18 @@ async def get_current_user(
             detail="Could not validate credentials",
         )
     
-    user = db.query(User).filter(User.username == username).first()
+    # Serve a detached copy of the cached row when we have one
+    cached = user_cache.get(username)
+    if cached is not None:
+        return User(**cached)
+    
+    user = await db.scalar(select(User).filter(User.username == username))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found",
         )
     
+    user_cache.set(username, {field: getattr(user, field) for field in CACHED_USER_FIELDS})
     return user
 
@@ -0,0 +1,168 @@
+"""Circuit breaker for the upstream LLM: fail fast while it is down, probe for recovery"""
+
+import os
+import time
+from collections import deque
+from typing import Deque, List
+
+from backend import metrics
+
+# Breaker settings
+LLM_BREAKER_ENABLED = os.getenv("LLM_BREAKER_ENABLED", "true").lower() == "true"
+LLM_BREAKER_WINDOW = float(os.getenv("LLM_BREAKER_WINDOW", "30"))  # seconds of outcomes considered
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "10"))  # don't judge on fewer calls
+LLM_BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))  # failure ratio that opens it
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))  # seconds open before probing
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+breaker_transitions = metrics.registry.counter(
+    "llm_circuit_transitions_total", "Upstream LLM circuit breaker state changes", ("state",)
+)
+breaker_rejections = metrics.registry.counter(
+    "llm_circuit_rejections_total", "Upstream LLM calls refused while the circuit was open"
+)
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling an upstream that is known to be failing"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Upstream circuit is open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Opens when the failure ratio over the last `window` seconds crosses
+    `error_rate`, rejects calls for `cooldown` seconds, then lets a single
+    probe through: its success closes the circuit, its failure reopens it"""
+
+    def __init__(self, enabled: bool, window: float, min_calls: int, error_rate: float, cooldown: float):
+        self.enabled = enabled
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        # One [second, calls, failures] bucket per second with outcomes
+        self._buckets: Deque[List[int]] = deque()
+        self.rejected = 0
+        self.opened = 0
+
+    def _prune(self, now: float):
+        horizon = int(now - self.window)
+        while self._buckets and self._buckets[0][0] <= horizon:
+            self._buckets.popleft()
+
+    def _counts(self):
+        calls = sum(bucket[1] for bucket in self._buckets)
+        failures = sum(bucket[2] for bucket in self._buckets)
+        return calls, failures
+
+    def _transition(self, state: str, now: float):
+        if state == self.state:
+            return
+        self.state = state
+        breaker_transitions.inc(state)
+        if state == OPEN:
+            self._opened_at = now
+            self.opened += 1
+            print(f"⚠️  Upstream LLM circuit opened; failing fast for {self.cooldown:.0f}s")
+        elif state == CLOSED:
+            self._buckets.clear()
+            print("✅ Upstream LLM circuit closed")
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed"""
+        return max(0.0, self._opened_at + self.cooldown - time.monotonic())
+
+    def check(self):
+        """Raise CircuitOpen if a call would be refused right now, without claiming the probe"""
+        if not self.enabled or self.state == CLOSED:
+            return
+        if (self.state == OPEN and self.retry_after() > 0) or (self.state == HALF_OPEN and self._probing):
+            self.rejected += 1
+            breaker_rejections.inc()
+            raise CircuitOpen(self.retry_after() or 1.0)
+
+    def before_call(self) -> bool:
+        """Admit a call or raise CircuitOpen; returns True if the call is the recovery probe"""
+        if not self.enabled or self.state == CLOSED:
+            return False
+
+        now = time.monotonic()
+        if self.state == OPEN and now - self._opened_at >= self.cooldown:
+            self._transition(HALF_OPEN, now)
+        if self.state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+
+        self.rejected += 1
+        breaker_rejections.inc()
+        raise CircuitOpen(self.retry_after() or 1.0)
+
+    def record(self, ok: bool, probe: bool = False):
+        """Record the outcome of an admitted call"""
+        if not self.enabled:
+            return
+
+        now = time.monotonic()
+        if probe:
+            self._probing = False
+            self._transition(CLOSED if ok else OPEN, now)
+            return
+        if self.state != CLOSED:
+            # A call admitted before the circuit opened
+            return
+
+        second = int(now)
+        if self._buckets and self._buckets[-1][0] == second:
+            bucket = self._buckets[-1]
+        else:
+            bucket = [second, 0, 0]
+            self._buckets.append(bucket)
+        bucket[1] += 1
+        bucket[2] += 0 if ok else 1
+
+        self._prune(now)
+        calls, failures = self._counts()
+        if calls >= self.min_calls and failures / calls >= self.error_rate:
+            self._transition(OPEN, now)
+
+    def abandon(self, probe: bool):
+        """Forget an admitted call that was cancelled before it had an outcome"""
+        if probe:
+            # Let the next caller probe instead
+            self._probing = False
+
+    def stats(self) -> dict:
+        """Current state and the outcomes in the window"""
+        self._prune(time.monotonic())
+        calls, failures = self._counts()
+        return {
+            "enabled": self.enabled,
+            "state": self.state,
+            "window_calls": calls,
+            "window_failures": failures,
+            "retry_after_seconds": round(self.retry_after(), 1) if self.state == OPEN else 0,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
+
+
+# Shared breaker for the upstream LLM in this process
+llm_breaker = CircuitBreaker(
+    LLM_BREAKER_ENABLED, LLM_BREAKER_WINDOW, LLM_BREAKER_MIN_CALLS,
+    LLM_BREAKER_ERROR_RATE, LLM_BREAKER_COOLDOWN,
+)
+
+metrics.registry.gauge(
+    "llm_circuit_state", "Upstream LLM circuit breaker state (0 closed, 1 half-open, 2 open)",
+    lambda: STATE_VALUES[llm_breaker.state],
+)
@@ -0,0 +1,63 @@
+"""Single-flight coalescing of identical in-flight LLM requests"""
+
+import asyncio
+import os
+from typing import Awaitable, Callable, Dict, Hashable
+
+from backend import metrics
+
+# Coalescing settings
+COALESCE_ENABLED = os.getenv("LLM_COALESCE_ENABLED", "true").lower() == "true"
+
+coalesced_requests = metrics.registry.counter(
+    "llm_coalesced_requests_total", "Chat requests that shared another request's upstream call"
+)
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its result"""
+
+    def __init__(self, enabled: bool):
+        self.enabled = enabled
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def run(self, key: Hashable, func: Callable[[], Awaitable]):
+        """Await func(), or the identical call already in flight for key"""
+        if not self.enabled:
+            return await func()
+
+        task = self._calls.get(key)
+        if task is None:
+            # The call runs as its own task so a caller that goes away
+            # does not cancel it for everyone else waiting on it
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+            coalesced_requests.inc()
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        """In-flight keys and how many callers shared an upstream call"""
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._calls),
+            "upstream_calls": self.leaders,
+            "coalesced": self.coalesced,
+        }
+
+
+# Shared coalescer for this process
+coalescer = SingleFlight(COALESCE_ENABLED)
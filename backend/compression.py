@@ -0,0 +1,103 @@
+"""Gzip compression of larger API responses"""
+
+import gzip
+import os
+
+from backend.static_assets import parse_accept_encoding
+
+# Compression settings
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # bytes
+COMPRESSION_LEVEL = int(os.getenv("COMPRESSION_LEVEL", "6"))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/plain", "text/html", "text/css", "application/javascript")
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware that gzips complete responses above a size threshold
+
+    Streamed bodies (Server-Sent Events, chunked responses) and responses that
+    already carry a Content-Encoding, like the precompressed frontend assets,
+    pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, level: int = COMPRESSION_LEVEL):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        accepted = parse_accept_encoding(headers.get(b"accept-encoding", b"").decode("latin-1"))
+        if accepted.get("gzip", accepted.get("*", 0)) <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                if not self._compressible(message["headers"]):
+                    passthrough = True
+                    await send(message)
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streaming or too small to be worth it: send as is
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = gzip.compress(body, compresslevel=self.level, mtime=0)
+            await send({**start_message, "headers": self._compressed_headers(start_message["headers"], len(compressed))})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _compressible(raw_headers) -> bool:
+        content_type = b""
+        for name, value in raw_headers:
+            name = name.lower()
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.lower()
+        return content_type.decode("latin-1").startswith(COMPRESSIBLE_TYPES)
+
+    @staticmethod
+    def _compressed_headers(raw_headers, length: int):
+        headers = []
+        vary = [b"Accept-Encoding"]
+        for name, value in raw_headers:
+            lowered = name.lower()
+            if lowered == b"content-length":
+                continue
+            if lowered == b"vary":
+                vary.insert(0, value)
+                continue
+            if lowered == b"etag" and not value.startswith(b"W/"):
+                # The compressed bytes differ, so the validator can only be weak
+                value = b"W/" + value
+            headers.append((name, value))
+        headers.append((b"content-encoding", b"gzip"))
+        headers.append((b"content-length", str(length).encode("latin-1")))
+        headers.append((b"vary", b", ".join(vary)))
+        return headers
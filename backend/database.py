@@ -1,41 +1,247 @@
-"""Database configuration and connection management"""
+"""Database configuration and connection management; the engines are created on first use"""
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text, Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from contextlib import AsyncExitStack
 import os
-from dotenv import load_dotenv
+import threading
+from typing import Optional
 
-load_dotenv()
+from backend import metrics
 
 # Database URL - supports both SQLite and MySQL
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Default to SQLite if no DATABASE_URL is set
-if not DATABASE_URL:
-    # Get the absolute path to the backend directory
-    backend_dir = os.path.dirname(os.path.abspath(__file__))
-    db_dir = os.path.join(backend_dir, "db")
-    os.makedirs(db_dir, exist_ok=True)
+# Default to a SQLite database file in backend/db/ if no DATABASE_URL is set
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "db", "fortune_teller.db")
+USING_DEFAULT_DATABASE = not DATABASE_URL
+if USING_DEFAULT_DATABASE:
+    DATABASE_URL = f"sqlite:///{DEFAULT_DB_PATH}"
+
+# SQL logging and connection pool settings
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() == "true"
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a connection
+# Check connections before use (default: on, except for SQLite, whose connections can't go stale)
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING")
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; stay under MySQL's wait_timeout
+
+# SQLite pragmas applied to every new connection
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))  # bytes
+
+# Async pool connections opened at startup instead of by the first requests
+DB_PREWARM_CONNECTIONS = int(os.getenv("DB_PREWARM_CONNECTIONS", "0"))
+
+
+def is_sqlite_memory(url: str) -> bool:
+    """In-memory SQLite databases need SQLAlchemy's default single-connection pool"""
+    parsed = make_url(url)
+    return parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")
+
+
+def pool_options(url: str) -> dict:
+    """Pooling keyword arguments for create_engine / create_async_engine"""
+    if is_sqlite_memory(url):
+        return {}
+    if DB_POOL_PRE_PING is None:
+        pre_ping = make_url(url).get_backend_name() != "sqlite"
+    else:
+        pre_ping = DB_POOL_PRE_PING.lower() == "true"
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_pre_ping": pre_ping,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Let readers run alongside a writer and wait out short write locks instead of failing"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+
+def configure_sqlite(sync_engine):
+    """Apply the pragmas to every connection a SQLite engine opens"""
+    if sync_engine.dialect.name == "sqlite" and not is_sqlite_memory(str(sync_engine.url)):
+        event.listen(sync_engine, "connect", set_sqlite_pragmas)
+
+
+# Async drivers for the synchronous URLs above
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def get_async_url(url: str) -> str:
+    """Translate a synchronous database URL to its async driver"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend in ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    return parsed.render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or get_async_url(DATABASE_URL)
+
+_engine: Optional[Engine] = None
+_async_engine: Optional[AsyncEngine] = None
+_engine_lock = threading.Lock()
+_announced = False
+
+
+def _announce():
+    """Log which database is in use, once, when the first engine is created"""
+    global _announced
+    if _announced:
+        return
+    _announced = True
+    if USING_DEFAULT_DATABASE:
+        os.makedirs(os.path.dirname(DEFAULT_DB_PATH), exist_ok=True)
+        print(f"📦 Using SQLite database at: {DEFAULT_DB_PATH}")
+    elif DATABASE_URL.startswith("mysql"):
+        print(f"🐬 Using MySQL database")
+    else:
+        print(f"🗄️ Using database: {DATABASE_URL}")
+
+
+def get_engine() -> Engine:
+    """The synchronous engine, created on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _announce()
+                connect_args = {}
+                if DATABASE_URL.startswith("sqlite"):
+                    connect_args = {"check_same_thread": False}
+                
+                engine = create_engine(DATABASE_URL, echo=DB_ECHO, connect_args=connect_args, **pool_options(DATABASE_URL))
+                configure_sqlite(engine)
+                if metrics.METRICS_ENABLED:
+                    metrics.instrument_engine(engine)
+                _engine = engine
+    return _engine
+
+
+def get_async_engine() -> AsyncEngine:
+    """The async engine for the API routes, created on first use"""
+    global _async_engine
+    if _async_engine is None:
+        with _engine_lock:
+            if _async_engine is None:
+                _announce()
+                async_engine = create_async_engine(
+                    ASYNC_DATABASE_URL,
+                    echo=DB_ECHO,
+                    # aiosqlite defaults to opening a new connection (and thread) per checkout
+                    poolclass=None if is_sqlite_memory(ASYNC_DATABASE_URL) else AsyncAdaptedQueuePool,
+                    **pool_options(ASYNC_DATABASE_URL)
+                )
+                configure_sqlite(async_engine.sync_engine)
+                
+                # Time every query and expose the pool's usage
+                if metrics.METRICS_ENABLED:
+                    metrics.instrument_engine(async_engine.sync_engine)
+                    metrics.instrument_pool(async_engine.sync_engine, pool_checked_out)
+                _async_engine = async_engine
+    return _async_engine
+
+
+def __getattr__(name: str):
+    # `from backend.database import engine` keeps working, creating the engine at that point
+    if name == "engine":
+        return get_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+if metrics.METRICS_ENABLED:
+    pool_checked_out = metrics.registry.gauge(
+        "db_pool_checked_out", "Connections checked out of the async pool"
+    )
+    metrics.registry.gauge(
+        "db_pool_size", "Configured size of the async pool",
+        lambda: _async_engine.pool.size() if _async_engine is not None else 0
+    )
+    # QueuePool.overflow() counts up from -pool_size; only connections beyond the pool count
+    metrics.registry.gauge(
+        "db_pool_overflow", "Overflow connections open in the async pool",
+        lambda: max(0, _async_engine.pool.overflow()) if _async_engine is not None else 0
+    )
+    metrics.registry.gauge(
+        "db_pool_checked_in", "Idle connections held by the async pool",
+        lambda: _async_engine.pool.checkedin() if _async_engine is not None else 0
+    )
+
+
+class _BindOnFirstUse:
+    """Session factory that creates its engine when the first session is made"""
+    
+    def __init__(self, get_bind, **kw):
+        super().__init__(**kw)
+        self._get_bind = get_bind
     
-    # SQLite database file in backend/db/
-    db_path = os.path.join(db_dir, "fortune_teller.db")
-    DATABASE_URL = f"sqlite:///{db_path}"
-    print(f"📦 Using SQLite database at: {db_path}")
-elif DATABASE_URL.startswith("mysql"):
-    print(f"🐬 Using MySQL database")
-else:
-    print(f"🗄️ Using database: {DATABASE_URL}")
-
-# Create engine with appropriate settings
-connect_args = {}
-if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
-
-engine = create_engine(DATABASE_URL, echo=True, connect_args=connect_args)
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=self._get_bind())
+        return super().__call__(**local_kw)
+
+
+class LazySessionmaker(_BindOnFirstUse, sessionmaker):
+    pass
+
+
+class LazyAsyncSessionmaker(_BindOnFirstUse, async_sessionmaker):
+    pass
+
 
 # Create session
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = LazySessionmaker(get_engine, autocommit=False, autoflush=False)
+
+# Async session for the API routes
+AsyncSessionLocal = LazyAsyncSessionmaker(
+    get_async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+
+async def prewarm(connections: int = DB_PREWARM_CONNECTIONS):
+    """Open pooled connections ahead of the first requests"""
+    if pool_options(ASYNC_DATABASE_URL):
+        # Overflow connections are closed when returned, so only the pool size is worth opening
+        connections = min(connections, DB_POOL_SIZE)
+    if connections <= 0:
+        return
+    
+    # Hold every connection until all are open, so each checkout opens a new one
+    async with AsyncExitStack() as stack:
+        for _ in range(connections):
+            connection = await stack.enter_async_context(get_async_engine().connect())
+            await connection.execute(text("SELECT 1"))
+
+
+def dispose_engines(close: bool = True):
+    """Drop the pooled connections of whichever engines exist"""
+    if _engine is not None:
+        _engine.dispose(close=close)
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=close)
+
 
 # Base class for models
 Base = declarative_base()
@@ -49,3 +255,8 @@ def get_db():
     finally:
         db.close()
 
+
+# Dependency to get an async DB session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -1,57 +1,153 @@
 """Email sending service for verification and password reset"""
 
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+import time
 import os
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING, Optional, Tuple
 
-load_dotenv()
+from backend import metrics
+from backend.models import EmailOutbox
+
+# smtplib and the MIME classes are imported when the first email is built or sent
+if TYPE_CHECKING:
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
 
 # Email configuration
 SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
 SMTP_USER = os.getenv("SMTP_USER", "")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+SMTP_USE_TLS = os.getenv("SMTP_USE_TLS", "true").lower() == "true"
+SMTP_USE_AUTH = os.getenv("SMTP_USE_AUTH", "true").lower() == "true"
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "10"))
+SMTP_IDLE_TIMEOUT = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
+SMTP_MAX_MESSAGES_PER_CONNECTION = int(os.getenv("SMTP_MAX_MESSAGES_PER_CONNECTION", "100"))
 FROM_EMAIL = os.getenv("FROM_EMAIL", SMTP_USER)
 APP_URL = os.getenv("APP_URL", "http://localhost:3000")
 
 
+def is_email_configured() -> bool:
+    """Check whether SMTP settings are present"""
+    return not SMTP_USE_AUTH or bool(SMTP_USER and SMTP_PASSWORD)
+
+
+def build_message(to_email: str, subject: str, html_content: str) -> "MIMEMultipart":
+    """Build a MIME message with HTML content"""
+    from email.mime.text import MIMEText
+    from email.mime.multipart import MIMEMultipart
+    
+    message = MIMEMultipart("alternative")
+    message["Subject"] = subject
+    message["From"] = FROM_EMAIL
+    message["To"] = to_email
+    
+    # Attach HTML content
+    html_part = MIMEText(html_content, "html")
+    message.attach(html_part)
+    return message
+
+
+class SMTPConnection:
+    """An authenticated SMTP connection reused across many messages"""
+    
+    def __init__(self):
+        self._server: Optional["smtplib.SMTP"] = None
+        self._sent_on_connection = 0
+        self._last_used = 0.0
+    
+    def _connect(self):
+        import smtplib
+        
+        server = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        try:
+            if SMTP_USE_TLS:
+                server.starttls()
+            if SMTP_USE_AUTH:
+                server.login(SMTP_USER, SMTP_PASSWORD)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+        self._sent_on_connection = 0
+    
+    def send(self, to_email: str, subject: str, html_content: str):
+        """Send one message, reconnecting if the server dropped the connection"""
+        import smtplib
+        
+        message = build_message(to_email, subject, html_content)
+        
+        # Recycle connections that are stale or have sent too many messages
+        if self._server is not None and (
+            time.monotonic() - self._last_used > SMTP_IDLE_TIMEOUT
+            or self._sent_on_connection >= SMTP_MAX_MESSAGES_PER_CONNECTION
+        ):
+            self.close()
+        
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            if self._server is None:
+                self._connect()
+            
+            try:
+                self._server.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                self.close()
+                self._connect()
+                self._server.send_message(message)
+            outcome = "ok"
+        finally:
+            metrics.smtp_send_duration.observe(time.perf_counter() - start, outcome)
+        
+        self._sent_on_connection += 1
+        self._last_used = time.monotonic()
+    
+    def close(self):
+        """Close the connection, ignoring errors from an already dead server"""
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            self._server.close()
+        self._server = None
+
+
 def send_email(to_email: str, subject: str, html_content: str) -> bool:
-    """Send an email"""
+    """Send an email immediately over a new connection"""
     
-    if not SMTP_USER or not SMTP_PASSWORD:
+    if not is_email_configured():
         print("⚠️  Email not configured. Check SMTP settings in .env")
         print(f"📧 Would send email to {to_email}: {subject}")
         return False
     
+    connection = SMTPConnection()
     try:
-        # Create message
-        message = MIMEMultipart("alternative")
-        message["Subject"] = subject
-        message["From"] = FROM_EMAIL
-        message["To"] = to_email
-        
-        # Attach HTML content
-        html_part = MIMEText(html_content, "html")
-        message.attach(html_part)
-        
-        # Send email
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.send_message(message)
-        
+        connection.send(to_email, subject, html_content)
         print(f"✅ Email sent successfully to {to_email}")
         return True
         
     except Exception as e:
         print(f"❌ Failed to send email to {to_email}: {str(e)}")
         return False
+    
+    finally:
+        connection.close()
 
 
-def send_verification_email(to_email: str, username: str, token: str) -> bool:
-    """Send email verification link"""
+def queue_email(db, to_email: str, subject: str, html_content: str) -> bool:
+    """Add an email to the outbox; it is delivered when the caller commits"""
+    if not is_email_configured():
+        print("⚠️  Email not configured. Check SMTP settings in .env")
+        print(f"📧 Would send email to {to_email}: {subject}")
+        return False
+    
+    db.add(EmailOutbox(to_email=to_email, subject=subject, html_content=html_content))
+    return True
+
+
+def build_verification_email(username: str, token: str) -> Tuple[str, str]:
+    """Build the subject and HTML for an email verification link"""
     
     verification_url = f"{APP_URL}/verify-email?token={token}"
     
@@ -94,11 +190,11 @@ def send_verification_email(to_email: str, username: str, token: str) -> bool:
     </html>
     """
     
-    return send_email(to_email, "✨ Verify Your Email - Constellation Fortune Teller", html_content)
+    return "✨ Verify Your Email - Constellation Fortune Teller", html_content
 
 
-def send_password_reset_email(to_email: str, username: str, token: str) -> bool:
-    """Send password reset link"""
+def build_password_reset_email(username: str, token: str) -> Tuple[str, str]:
+    """Build the subject and HTML for a password reset link"""
     
     reset_url = f"{APP_URL}/reset-password?token={token}"
     
@@ -149,5 +245,24 @@ def send_password_reset_email(to_email: str, username: str, token: str) -> bool:
     </html>
     """
     
-    return send_email(to_email, "🔑 Reset Your Password - Constellation Fortune Teller", html_content)
+    return "🔑 Reset Your Password - Constellation Fortune Teller", html_content
+
+
+def send_verification_email(to_email: str, username: str, token: str) -> bool:
+    """Send email verification link"""
+    return send_email(to_email, *build_verification_email(username, token))
+
+
+def send_password_reset_email(to_email: str, username: str, token: str) -> bool:
+    """Send password reset link"""
+    return send_email(to_email, *build_password_reset_email(username, token))
+
+
+def queue_verification_email(db, to_email: str, username: str, token: str) -> bool:
+    """Queue email verification link in the outbox"""
+    return queue_email(db, to_email, *build_verification_email(username, token))
+
 
+def queue_password_reset_email(db, to_email: str, username: str, token: str) -> bool:
+    """Queue password reset link in the outbox"""
+    return queue_email(db, to_email, *build_password_reset_email(username, token))
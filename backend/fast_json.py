@@ -0,0 +1,40 @@
+"""Fast JSON serialization for API responses"""
+
+import json
+import os
+from typing import Any, Type
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel
+from starlette.responses import Response
+
+try:
+    import orjson  # optional: pip install orjson
+except ImportError:
+    orjson = None
+
+# Set to false to go back to FastAPI's default validate-and-encode path everywhere
+FAST_JSON_ENABLED = os.getenv("FAST_JSON_ENABLED", "true").lower() == "true"
+
+# Response class for routes that return plain dicts
+DefaultResponse: Type[JSONResponse] = ORJSONResponse if FAST_JSON_ENABLED and orjson is not None else JSONResponse
+
+
+def model_response(model: BaseModel, status_code: int = 200):
+    """Send an already-validated model as JSON.
+
+    FastAPI would dump the model to a dict, validate it again against the
+    route's response_model and run it through jsonable_encoder before encoding.
+    The model is typed already, so pydantic-core serializes it in one step. The
+    route keeps its response_model for the OpenAPI schema.
+    """
+    if not FAST_JSON_ENABLED:
+        return model
+    return Response(content=model.model_dump_json(), status_code=status_code, media_type="application/json")
+
+
+def dumps(data: Any) -> str:
+    """Compact JSON text, with orjson when it is installed"""
+    if FAST_JSON_ENABLED and orjson is not None:
+        return orjson.dumps(data).decode("utf-8")
+    return json.dumps(data)
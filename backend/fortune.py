@@ -0,0 +1,250 @@
+"""Deterministic daily fortunes for all zodiac signs"""
+
+import hashlib
+import json
+import random
+from datetime import date, datetime, timedelta
+from typing import Dict, Optional
+
+# Zodiac signs with their daily fortunes, lucky colors and compatible signs
+ZODIAC_DATA = {
+    "aries": {
+        "name": "Aries",
+        "icon": "♈",
+        "element": "Fire",
+        "fortunes": [
+            "Today's fiery energy brings new opportunities. Your courage will lead you to unexpected success.",
+            "The stars align in your favor today. Take bold action and trust your instincts.",
+            "Your natural leadership shines through. Others look to you for guidance and inspiration.",
+            "A challenge presents itself, but your determination will see you through victoriously.",
+            "Creative energy flows strongly. Express yourself boldly and authentically.",
+        ],
+        "colors": ["Red", "Scarlet", "Crimson", "Orange"],
+        "compatibleSigns": ["Leo", "Sagittarius", "Gemini", "Aquarius"],
+    },
+    "taurus": {
+        "name": "Taurus",
+        "icon": "♉",
+        "element": "Earth",
+        "fortunes": [
+            "Patience and persistence pay off today. Your steady approach brings tangible rewards.",
+            "Financial opportunities emerge. Trust your practical instincts about investments.",
+            "Comfort and security are within reach. Focus on building lasting foundations.",
+            "Your reliability makes you invaluable to others. Your help will be deeply appreciated.",
+            "Indulge in life's pleasures today. You've earned a moment of luxury and relaxation.",
+        ],
+        "colors": ["Green", "Pink", "Emerald", "Turquoise"],
+        "compatibleSigns": ["Virgo", "Capricorn", "Cancer", "Pisces"],
+    },
+    "gemini": {
+        "name": "Gemini",
+        "icon": "♊",
+        "element": "Air",
+        "fortunes": [
+            "Communication is your superpower today. Your words inspire and enlighten others.",
+            "Curiosity leads to fascinating discoveries. Follow your interests wherever they take you.",
+            "Social connections bring joy and opportunity. Network and share your brilliant ideas.",
+            "Adaptability is your strength. Embrace change and flow with new circumstances.",
+            "Your quick wit and charm open doors. Express yourself with confidence.",
+        ],
+        "colors": ["Yellow", "Light Blue", "Silver", "White"],
+        "compatibleSigns": ["Libra", "Aquarius", "Aries", "Leo"],
+    },
+    "cancer": {
+        "name": "Cancer",
+        "icon": "♋",
+        "element": "Water",
+        "fortunes": [
+            "Trust your intuition today. Your emotional intelligence guides you to the right path.",
+            "Home and family bring comfort and joy. Nurture your closest relationships.",
+            "Your caring nature is deeply appreciated. Someone needs your compassionate support.",
+            "Creative imagination flows freely. Express your feelings through artistic pursuits.",
+            "Protect your energy while staying open to love. Balance is key to your wellbeing.",
+        ],
+        "colors": ["Silver", "White", "Pearl", "Light Blue"],
+        "compatibleSigns": ["Scorpio", "Pisces", "Taurus", "Virgo"],
+    },
+    "leo": {
+        "name": "Leo",
+        "icon": "♌",
+        "element": "Fire",
+        "fortunes": [
+            "Your natural charisma is magnetic today. Step into the spotlight with confidence.",
+            "Generosity of spirit brings unexpected blessings. Share your warmth with others.",
+            "Creative projects flourish under your passionate guidance. Express your unique talents.",
+            "Leadership opportunities arise. Your courage inspires others to follow your vision.",
+            "Joy and celebration are in the air. Let your playful side shine through.",
+        ],
+        "colors": ["Gold", "Orange", "Yellow", "Royal Purple"],
+        "compatibleSigns": ["Aries", "Sagittarius", "Gemini", "Libra"],
+    },
+    "virgo": {
+        "name": "Virgo",
+        "icon": "♍",
+        "element": "Earth",
+        "fortunes": [
+            "Your attention to detail solves complex problems. Your analytical skills are unmatched.",
+            "Organization brings clarity and peace. Take time to create order in your environment.",
+            "Service to others fulfills your soul. Your helpful nature makes a real difference.",
+            "Health and wellness take priority. Your body appreciates your mindful care.",
+            "Practical wisdom guides your decisions. Trust in your methodical approach.",
+        ],
+        "colors": ["Navy Blue", "Grey", "Beige", "Forest Green"],
+        "compatibleSigns": ["Taurus", "Capricorn", "Cancer", "Scorpio"],
+    },
+    "libra": {
+        "name": "Libra",
+        "icon": "♎",
+        "element": "Air",
+        "fortunes": [
+            "Balance and harmony are within reach. Your diplomatic skills bring peace to conflicts.",
+            "Beauty surrounds you today. Appreciate art, nature, and elegant solutions.",
+            "Partnerships flourish under your fair and thoughtful guidance. Collaboration brings success.",
+            "Your sense of justice guides important decisions. Stand up for what's right.",
+            "Social grace opens doors. Your charm and tact create wonderful opportunities.",
+        ],
+        "colors": ["Pink", "Light Blue", "Lavender", "Mint Green"],
+        "compatibleSigns": ["Gemini", "Aquarius", "Leo", "Sagittarius"],
+    },
+    "scorpio": {
+        "name": "Scorpio",
+        "icon": "♏",
+        "element": "Water",
+        "fortunes": [
+            "Intense focus brings breakthrough insights. Your determination is unstoppable.",
+            "Hidden truths come to light. Your intuition reveals what others cannot see.",
+            "Transformation is in the air. Embrace change and emerge stronger than before.",
+            "Passionate energy drives your pursuits. Channel your intensity into meaningful goals.",
+            "Loyalty and depth in relationships bring profound connections. Trust those who earn it.",
+        ],
+        "colors": ["Deep Red", "Black", "Burgundy", "Dark Purple"],
+        "compatibleSigns": ["Cancer", "Pisces", "Virgo", "Capricorn"],
+    },
+    "sagittarius": {
+        "name": "Sagittarius",
+        "icon": "♐",
+        "element": "Fire",
+        "fortunes": [
+            "Adventure calls your name. Expand your horizons through travel or learning.",
+            "Optimism attracts abundance. Your positive outlook creates wonderful opportunities.",
+            "Truth and wisdom guide your path. Share your philosophical insights with others.",
+            "Freedom and exploration fulfill your spirit. Break free from limiting routines.",
+            "Your enthusiasm is contagious. Inspire others with your adventurous spirit.",
+        ],
+        "colors": ["Purple", "Dark Blue", "Turquoise", "Red"],
+        "compatibleSigns": ["Aries", "Leo", "Libra", "Aquarius"],
+    },
+    "capricorn": {
+        "name": "Capricorn",
+        "icon": "♑",
+        "element": "Earth",
+        "fortunes": [
+            "Ambition drives you forward. Your disciplined approach leads to lasting success.",
+            "Responsibility brings rewards. Your dedication does not go unnoticed.",
+            "Strategic planning pays dividends. Take time to map out your long-term goals.",
+            "Professional opportunities arise. Your reputation for excellence opens doors.",
+            "Patience and persistence are your allies. Success comes to those who endure.",
+        ],
+        "colors": ["Dark Green", "Brown", "Grey", "Black"],
+        "compatibleSigns": ["Taurus", "Virgo", "Scorpio", "Pisces"],
+    },
+    "aquarius": {
+        "name": "Aquarius",
+        "icon": "♒",
+        "element": "Air",
+        "fortunes": [
+            "Innovation and originality set you apart. Your unique perspective solves problems.",
+            "Humanitarian efforts bring fulfillment. Make a difference in your community.",
+            "Independent thinking leads to breakthroughs. Trust your unconventional ideas.",
+            "Friendships and social networks flourish. Connect with like-minded visionaries.",
+            "Future-focused vision guides your choices. You're ahead of your time.",
+        ],
+        "colors": ["Electric Blue", "Silver", "Aqua", "Neon Green"],
+        "compatibleSigns": ["Gemini", "Libra", "Aries", "Sagittarius"],
+    },
+    "pisces": {
+        "name": "Pisces",
+        "icon": "♓",
+        "element": "Water",
+        "fortunes": [
+            "Intuition and dreams guide your path. Trust the whispers of your soul.",
+            "Compassion opens hearts. Your empathetic nature heals those around you.",
+            "Artistic expression flows naturally. Create beauty through your unique vision.",
+            "Spiritual insights bring peace. Connect with your higher self through meditation.",
+            "Imagination knows no bounds. Your creative dreams can become reality.",
+        ],
+        "colors": ["Sea Green", "Lavender", "Purple", "Aquamarine"],
+        "compatibleSigns": ["Cancer", "Scorpio", "Taurus", "Capricorn"],
+    },
+}
+
+ADVICE_TEMPLATES = [
+    "Stay true to your authentic self and trust your inner wisdom.",
+    "Take time for self-care and recharge your spiritual batteries.",
+    "Be open to unexpected opportunities that come your way.",
+    "Listen carefully to what others are really saying beneath their words.",
+    "Balance your ambitions with moments of rest and reflection.",
+    "Trust the process, even when the path isn't clear.",
+    "Your kindness today will create ripples of positivity.",
+    "Focus on what you can control and release what you cannot.",
+    "Embrace change as a pathway to growth and transformation.",
+    "Connect with nature to ground yourself and find clarity.",
+]
+
+ENERGY_ASPECTS = ("love", "career", "health", "finance")
+
+
+class DailyFortunes:
+    """One day's fortunes for every sign, pre-serialized with their ETags"""
+    
+    def __init__(self, day: date):
+        self.day = day
+        self.fortunes = compute_daily_fortunes(day)
+        self.bodies: Dict[str, bytes] = {}
+        self.etags: Dict[str, str] = {}
+        for sign, fortune in self.fortunes.items():
+            body = json.dumps(fortune, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            self.bodies[sign] = body
+            self.etags[sign] = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def compute_daily_fortunes(day: date) -> Dict[str, dict]:
+    """Compute the fortunes of all signs for a day in one pass from a date seed"""
+    # A string seed is hashed with SHA-512, so every worker draws the same values
+    rng = random.Random(f"constellation-fortunes-{day.isoformat()}")
+    
+    fortunes = {}
+    for sign, data in ZODIAC_DATA.items():
+        fortunes[sign] = {
+            "sign": sign,
+            "name": data["name"],
+            "icon": data["icon"],
+            "element": data["element"],
+            "date": day.isoformat(),
+            "fortune": rng.choice(data["fortunes"]),
+            "energy": {aspect: rng.randint(60, 100) for aspect in ENERGY_ASPECTS},
+            "luckyNumbers": sorted(rng.sample(range(1, 100), 5)),
+            "luckyColor": rng.choice(data["colors"]),
+            "compatibleSign": rng.choice(data["compatibleSigns"]),
+            "advice": rng.choice(ADVICE_TEMPLATES),
+        }
+    return fortunes
+
+
+def seconds_until_midnight(now: Optional[datetime] = None) -> int:
+    """Seconds until the next UTC midnight, when fortunes change"""
+    now = now or datetime.utcnow()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max(1, int((midnight - now).total_seconds()))
+
+
+_today: Optional[DailyFortunes] = None
+
+
+def get_daily_fortunes() -> DailyFortunes:
+    """Today's fortunes, computed once per UTC day"""
+    global _today
+    today = datetime.utcnow().date()
+    if _today is None or _today.day != today:
+        _today = DailyFortunes(today)
+    return _today
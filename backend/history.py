@@ -0,0 +1,62 @@
+"""Conversation history window for chat prompts"""
+
+import os
+from typing import Dict, List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.models import ChatMessage
+
+# Prompt budget for previous turns (the system prompt and new message are extra)
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1500"))
+HISTORY_MAX_MESSAGES = int(os.getenv("HISTORY_MAX_MESSAGES", "40"))
+
+# Approximate per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of English text (about 4 characters per token)"""
+    return len(text) // 4 + 1
+
+
+def trim_to_budget(messages: List[Dict[str, str]], token_budget: int) -> List[Dict[str, str]]:
+    """Keep the newest messages that fit in the budget, in chronological order"""
+    kept = []
+    used = 0
+    for message in reversed(messages):
+        cost = estimate_tokens(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+        if used + cost > token_budget:
+            break
+        kept.append(message)
+        used += cost
+    kept.reverse()
+    return kept
+
+
+async def load_recent_history(
+    db: AsyncSession,
+    chat_session_id: int,
+    after_id: int = 0,
+    token_budget: int = HISTORY_TOKEN_BUDGET,
+) -> Tuple[List[Dict[str, str]], bool]:
+    """
+    Load the most recent turns of a session that fit in the token budget.
+    
+    Only messages newer than `after_id` (the last summarized message) are
+    considered. Also returns whether older messages were left out.
+    """
+    
+    # Newest first, served by the (session_id, created_at) index
+    rows = (await db.execute(
+        select(ChatMessage.role, ChatMessage.content)
+        .filter(ChatMessage.session_id == chat_session_id, ChatMessage.id > after_id)
+        .order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc())
+        .limit(HISTORY_MAX_MESSAGES)
+    )).all()
+    
+    messages = [{"role": role, "content": content} for role, content in reversed(rows)]
+    history = trim_to_budget(messages, token_budget)
+    truncated = len(rows) == HISTORY_MAX_MESSAGES or len(history) < len(messages)
+    return history, truncated
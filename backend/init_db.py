@@ -1,14 +1,26 @@
 """Initialize the database - create all tables"""
 
+from sqlalchemy import inspect
+
 from backend.database import engine, Base
-from backend.models import User, ChatSession, ChatMessage
+from backend.models import User, ChatSession, ChatMessage, ChatSummary, ChatArchive, VerificationToken, EmailOutbox
+
+def create_missing_indexes():
+    """Create indexes that were added to models after their tables existed"""
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing:
+                print(f"Creating index {index.name}...")
+                index.create(bind=engine)
 
 def init_database():
     """Create all database tables"""
     print("Creating database tables...")
     Base.metadata.create_all(bind=engine)
+    create_missing_indexes()
     print("✅ Database tables created successfully!")
 
 if __name__ == "__main__":
     init_database()
-
@@ -0,0 +1,212 @@
+"""Production launcher: preforked uvicorn workers sharing one listening socket
+
+The app is imported once in the master and then forked, so workers start fast
+and share the imported code. SIGTERM/SIGINT stop every worker gracefully:
+they stop accepting connections and finish in-flight requests, for at most
+GRACEFUL_TIMEOUT seconds. Workers that crash are restarted.
+
+Usage:
+    python run.py --prod
+    python -m backend.launcher --workers 4 --port 3000
+"""
+
+import argparse
+import os
+import signal
+import sys
+import time
+import traceback
+
+import uvicorn
+
+# Process and socket settings
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "3000"))
+BACKLOG = int(os.getenv("BACKLOG", "2048"))
+KEEPALIVE_TIMEOUT = int(os.getenv("KEEPALIVE_TIMEOUT", "75"))  # keep above the load balancer's idle timeout
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))  # seconds to drain on shutdown
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", "0"))  # per-worker connection cap, 0 = none
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+DEFAULT_SECRET_KEY = "your-secret-key-change-this-in-production"
+
+
+def check_startup() -> list:
+    """Check configuration and database before any worker starts, returning problems found"""
+    problems = []
+
+    if os.getenv("SECRET_KEY", DEFAULT_SECRET_KEY) == DEFAULT_SECRET_KEY:
+        problems.append("SECRET_KEY is not set; tokens would be signed with the public default")
+    if not os.getenv("OPENAI_API_KEY"):
+        problems.append("OPENAI_API_KEY is not set; chat would be unavailable")
+
+    from sqlalchemy import inspect, text
+    from backend.database import engine, Base
+    import backend.models  # noqa: F401 - registers the tables on Base
+
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+            missing = set(Base.metadata.tables) - set(inspect(connection).get_table_names())
+        if missing:
+            problems.append(
+                f"Database is missing tables {', '.join(sorted(missing))}; run python -m backend.init_db"
+            )
+    except Exception as e:
+        problems.append(f"Cannot connect to the database: {e}")
+    finally:
+        # Workers must not inherit the master's connections
+        engine.dispose()
+
+    return problems
+
+
+def build_config(args) -> uvicorn.Config:
+    """uvicorn settings for a production worker"""
+    return uvicorn.Config(
+        "backend.server:app",
+        host=args.host,
+        port=args.port,
+        backlog=BACKLOG,
+        timeout_keep_alive=KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=GRACEFUL_TIMEOUT,
+        limit_concurrency=LIMIT_CONCURRENCY or None,
+        proxy_headers=True,
+        forwarded_allow_ips=FORWARDED_ALLOW_IPS,
+        access_log=False,
+        log_level=args.log_level,
+    )
+
+
+def run_worker(config: uvicorn.Config, sock, index: int):
+    """Serve requests in a forked worker until told to stop"""
+    from backend.database import dispose_engines
+
+    # Read by the startup hook: only worker 0 runs the jobs that must not run twice
+    os.environ["WORKER_INDEX"] = str(index)
+
+    # Start with fresh pools; the master's are not safe to share across fork
+    dispose_engines(close=False)
+
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Master:
+    """Fork workers, restart the ones that die and drain them all on shutdown"""
+
+    def __init__(self, config: uvicorn.Config, workers: int):
+        self.config = config
+        self.workers = workers
+        self.children = {}  # pid -> (start time, worker index)
+        self.stopping = False
+        self.sock = None
+
+    def spawn(self, index: int):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                run_worker(self.config, self.sock, index)
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = (time.monotonic(), index)
+
+    def stop(self, signum, frame):
+        if not self.stopping:
+            print(f"🛑 Received {signal.Signals(signum).name}, draining {len(self.children)} workers...")
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def reap(self):
+        """Collect exited workers, restarting them unless shutting down"""
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            child = self.children.pop(pid, None)
+            if child is None or self.stopping:
+                continue
+            started, index = child
+            print(f"⚠️  Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting")
+            # Avoid a tight restart loop when workers die on startup
+            if time.monotonic() - started < 1:
+                time.sleep(1)
+            # The replacement takes over the index, so worker 0 always exists
+            self.spawn(index)
+
+    def run(self):
+        # Preload the app once; workers inherit it through fork
+        self.config.load()
+        # The LLM SDK is otherwise imported by each worker's first chat
+        from backend import llm
+        llm.import_sdk()
+        self.sock = self.config.bind_socket()
+
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+        for index in range(self.workers):
+            self.spawn(index)
+        print(f"🚀 Started {self.workers} workers on http://{self.config.host}:{self.config.port}")
+
+        deadline = None
+        while self.children:
+            self.reap()
+            if self.stopping:
+                deadline = deadline or time.monotonic() + GRACEFUL_TIMEOUT + 5
+                if time.monotonic() > deadline:
+                    print(f"⚠️  Killing {len(self.children)} workers that did not drain in time")
+                    for pid in list(self.children):
+                        try:
+                            os.kill(pid, signal.SIGKILL)
+                        except ProcessLookupError:
+                            pass
+                    deadline = float("inf")
+            time.sleep(0.2)
+
+        self.sock.close()
+        print("✅ All workers stopped")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Fortune Teller API with multiple workers")
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--skip-checks", action="store_true", help="Start even if the startup check fails")
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("🔮 Constellation Fortune Teller - Production Server")
+    print("=" * 60)
+
+    problems = check_startup()
+    for problem in problems:
+        print(f"❌ {problem}")
+    if problems and not args.skip_checks:
+        sys.exit(1)
+
+    config = build_config(args)
+    if args.workers <= 1 or not hasattr(os, "fork"):
+        # Single process (or no fork support): let uvicorn run it directly
+        uvicorn.Server(config).run()
+        return
+
+    Master(config, args.workers).run()
+
+
+if __name__ == "__main__":
+    main()
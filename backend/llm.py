@@ -0,0 +1,356 @@
+"""Async LLM client with a shared connection pool, bounded concurrency,
+retries with jittered backoff and a circuit breaker"""
+
+import asyncio
+import os
+import random
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from backend import metrics
+from backend.circuit_breaker import llm_breaker
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# Upstream configuration
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # e.g. a local stub completion server
+
+# Timeouts (seconds)
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_ATTEMPT_TIMEOUT = float(os.getenv("LLM_ATTEMPT_TIMEOUT", "20"))  # per attempt; to the first token when streaming
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "45"))  # all attempts and backoff together
+
+# Retries of timeouts, connection errors, 429s and 5xxs, with full-jitter exponential backoff
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.25"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "4"))
+
+# Connection pool and concurrency limits
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "64"))
+
+# Upstream connections opened at startup, so the first chats skip the TCP and TLS handshakes
+LLM_PREWARM_CONNECTIONS = int(os.getenv("LLM_PREWARM_CONNECTIONS", "0"))
+
+_client: Optional["AsyncOpenAI"] = None
+_http_client = None  # the client's pooled httpx.AsyncClient
+_semaphore: Optional[asyncio.Semaphore] = None
+_in_flight = 0
+
+llm_retries = metrics.registry.counter(
+    "llm_retries_total", "Upstream LLM attempts retried after a retryable error", ("kind",)
+)
+llm_failures = metrics.registry.counter(
+    "llm_failures_total", "Upstream LLM calls that failed after all retries", ("kind", "reason")
+)
+_retries = 0
+_failures = 0
+
+
+class UpstreamError(Exception):
+    """The upstream kept failing with retryable errors until the retries or the deadline ran out"""
+
+    def __init__(self, message: str, timed_out: bool, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.timed_out = timed_out
+        self.retry_after = retry_after
+
+
+def import_sdk():
+    """Import the OpenAI SDK now instead of on the first chat"""
+    if OPENAI_API_KEY:
+        import httpx  # noqa: F401
+        import openai  # noqa: F401
+
+
+def get_client() -> Optional["AsyncOpenAI"]:
+    """Get the shared async OpenAI client, creating it on first use"""
+    global _client, _http_client
+    if _client is None and OPENAI_API_KEY:
+        # The SDK takes a third of a second to import; only pay for it when needed
+        import httpx
+        from openai import AsyncOpenAI
+
+        http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+        _client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            base_url=OPENAI_BASE_URL or None,
+            http_client=http_client,
+            # Retries are ours, so they can see the deadline and the circuit breaker
+            max_retries=0,
+        )
+        _http_client = http_client
+    return _client
+
+
+def is_available() -> bool:
+    """Check whether an upstream LLM is configured"""
+    return bool(OPENAI_API_KEY)
+
+
+def in_flight() -> int:
+    """Number of upstream calls currently in progress"""
+    return _in_flight
+
+
+metrics.registry.gauge("llm_in_flight", "Upstream LLM calls in progress", in_flight)
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    # Created lazily so it binds to the running event loop
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(LLM_MAX_IN_FLIGHT)
+    return _semaphore
+
+
+def is_timeout(e: BaseException) -> bool:
+    """Whether an attempt ran out of time, ours or the HTTP client's"""
+    if isinstance(e, asyncio.TimeoutError):
+        return True
+    import httpx
+    import openai
+    return isinstance(e, (openai.APITimeoutError, httpx.TimeoutException))
+
+
+def is_retryable(e: BaseException) -> bool:
+    """Whether another attempt could succeed: timeouts, connection errors, 408/409/429 and 5xx"""
+    if is_timeout(e):
+        return True
+    import httpx
+    import openai
+    # httpx errors surface unwrapped while a stream is being read
+    if isinstance(e, (openai.APIConnectionError, httpx.TransportError)):
+        return True
+    if isinstance(e, openai.APIStatusError):
+        return e.status_code in (408, 409, 429) or e.status_code >= 500
+    return False
+
+
+def _retry_after(e: BaseException) -> Optional[float]:
+    """Seconds asked for by a Retry-After header on the upstream's error response"""
+    response = getattr(e, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
+
+
+def backoff_delay(retry: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff, at least what the upstream asked for"""
+    delay = random.uniform(0, min(LLM_RETRY_MAX_DELAY, LLM_RETRY_BASE_DELAY * 2 ** retry))
+    if retry_after:
+        delay = max(delay, min(retry_after, LLM_RETRY_MAX_DELAY))
+    return delay
+
+
+async def _with_retries(kind: str, attempt: Callable[[], Awaitable], settle: bool = True):
+    """Run attempt() under the per-attempt timeout, retrying retryable errors
+    until LLM_MAX_RETRIES or LLM_DEADLINE runs out; raises CircuitOpen without
+    calling the upstream while the breaker is open.
+
+    Returns (result, probe). With settle=False a successful attempt is not yet
+    recorded with the breaker; the caller records its outcome once it has one.
+    """
+    global _retries, _failures
+
+    deadline = time.monotonic() + LLM_DEADLINE
+    retry = 0
+    while True:
+        probe = llm_breaker.before_call()
+        timeout = min(LLM_ATTEMPT_TIMEOUT, deadline - time.monotonic())
+        try:
+            result = await asyncio.wait_for(attempt(), timeout)
+        except Exception as e:
+            retryable = is_retryable(e)
+            # Errors the upstream answered properly, like a bad request, say nothing about its health
+            llm_breaker.record(not retryable, probe)
+            if not retryable:
+                raise
+
+            timed_out = is_timeout(e)
+            delay = backoff_delay(retry, _retry_after(e))
+            if retry >= LLM_MAX_RETRIES or time.monotonic() + delay >= deadline or probe:
+                _failures += 1
+                llm_failures.inc(kind, "timeout" if timed_out else "error")
+                reason = f"timed out after {timeout:.1f}s" if timed_out else str(e)
+                raise UpstreamError(
+                    f"Upstream LLM {reason} ({retry + 1} attempts)", timed_out, _retry_after(e)
+                ) from e
+
+            _retries += 1
+            llm_retries.inc(kind)
+            retry += 1
+            await asyncio.sleep(delay)
+        except BaseException:
+            llm_breaker.abandon(probe)
+            raise
+        else:
+            if settle:
+                llm_breaker.record(True, probe)
+            return result, probe
+
+
+async def chat_completion(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+) -> str:
+    """Run a chat completion without blocking the event loop"""
+    global _in_flight
+
+    client = get_client()
+    if client is None:
+        raise RuntimeError("LLM client is not configured")
+
+    async def attempt():
+        return await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+
+    async with _get_semaphore():
+        _in_flight += 1
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            completion, _ = await _with_retries("completion", attempt)
+            outcome = "ok"
+        except UpstreamError as e:
+            outcome = "timeout" if e.timed_out else "error"
+            raise
+        finally:
+            _in_flight -= 1
+            metrics.llm_request_duration.observe(time.perf_counter() - start, "completion", outcome)
+
+    return completion.choices[0].message.content
+
+
+async def _tokens(stream) -> AsyncIterator[str]:
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        token = chunk.choices[0].delta.content
+        if token:
+            yield token
+
+
+async def stream_chat_completion(
+    messages: List[Dict[str, str]],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+) -> AsyncIterator[str]:
+    """Stream a chat completion, yielding content tokens as they arrive"""
+    global _in_flight, _failures
+
+    client = get_client()
+    if client is None:
+        raise RuntimeError("LLM client is not configured")
+
+    async def attempt():
+        # An attempt lasts until the first token; nothing has been sent yet, so it can be retried
+        stream = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+        try:
+            tokens = _tokens(stream)
+            first = await tokens.__anext__()
+        except StopAsyncIteration:
+            first = None
+        except BaseException:
+            await stream.response.aclose()
+            raise
+        return stream, tokens, first
+
+    async with _get_semaphore():
+        _in_flight += 1
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            # The call's one outcome is recorded when the stream ends, not at the first token
+            (stream, tokens, first), probe = await _with_retries("stream", attempt, settle=False)
+            settled = False
+            try:
+                if first is not None:
+                    yield first
+                    async for token in tokens:
+                        yield token
+                outcome = "ok"
+                llm_breaker.record(True, probe)
+                settled = True
+            except Exception as e:
+                # Tokens already went to the client, so a stall or drop mid-stream is not retried
+                retryable = is_retryable(e)
+                llm_breaker.record(not retryable, probe)
+                settled = True
+                if not retryable:
+                    raise
+                _failures += 1
+                llm_failures.inc("stream", "interrupted")
+                raise UpstreamError(f"Upstream LLM stream interrupted: {e}", is_timeout(e)) from e
+            finally:
+                if not settled:
+                    # The consumer stopped early, which says nothing about the upstream
+                    llm_breaker.abandon(probe)
+                # Release the pooled connection if the consumer stops early
+                await stream.response.aclose()
+        except UpstreamError as e:
+            outcome = "timeout" if e.timed_out else "error"
+            raise
+        finally:
+            _in_flight -= 1
+            metrics.llm_request_duration.observe(time.perf_counter() - start, "stream", outcome)
+
+
+def stats() -> dict:
+    """Upstream calls in flight, retries, failures and the circuit breaker"""
+    return {
+        "in_flight": _in_flight,
+        "retries": _retries,
+        "failures": _failures,
+        "circuit": llm_breaker.stats(),
+    }
+
+
+async def prewarm(connections: int = LLM_PREWARM_CONNECTIONS):
+    """Open pooled upstream connections ahead of the first chats"""
+    client = get_client()
+    if client is None or connections <= 0:
+        return
+
+    async def connect():
+        # Any response leaves a kept-alive, handshaken connection in the pool
+        await _http_client.head(str(client.base_url))
+
+    results = await asyncio.gather(*(connect() for _ in range(connections)), return_exceptions=True)
+    failed = [result for result in results if isinstance(result, Exception)]
+    if failed:
+        print(f"⚠️  Could not prewarm {len(failed)} upstream LLM connections: {failed[0]}")
+
+
+async def close_client():
+    """Close the shared HTTP connection pool"""
+    global _client, _http_client
+    if _client is not None:
+        await _client.close()
+        _client = None
+        _http_client = None
@@ -0,0 +1,224 @@
+"""Lightweight Prometheus metrics for the hot paths"""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Latency buckets in seconds, from fast DB queries to slow LLM completions
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """Cumulative latency histogram with optional labels"""
+    
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, *label_values: str):
+        """Record one observation"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Per-bucket counts (plus +Inf), sum, count
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+    
+    @contextmanager
+    def time(self, *label_values: str):
+        """Time a block of code"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(series[0]), series[1], series[2]) for labels, series in self._series.items()]
+        for labels, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {count}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter with optional labels"""
+    
+    def __init__(self, name: str, help_text: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, *label_values: str, amount: float = 1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+    
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            snapshot = sorted(self._values.items())
+        for labels, value in snapshot:
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Gauge:
+    """Gauge that is either set directly or read from a callback at scrape time"""
+    
+    def __init__(self, name: str, help_text: str, callback: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.help_text = help_text
+        self.callback = callback
+        self.value = 0.0
+    
+    def inc(self, amount: float = 1):
+        self.value += amount
+    
+    def dec(self, amount: float = 1):
+        self.value -= amount
+    
+    def render(self) -> List[str]:
+        value = self.value
+        if self.callback is not None:
+            try:
+                value = self.callback()
+            except Exception:
+                return []
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+
+class Registry:
+    """Collection of metrics rendered in the Prometheus text format"""
+    
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+    
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+    
+    def histogram(self, name: str, help_text: str, labels: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labels, buckets))
+    
+    def counter(self, name: str, help_text: str, labels: Tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labels))
+    
+    def gauge(self, name: str, help_text: str, callback: Optional[Callable[[], float]] = None) -> Gauge:
+        return self.register(Gauge(name, help_text, callback))
+    
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# Hot-path timers
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+db_query_duration = registry.histogram(
+    "db_query_duration_seconds", "Database statement execution time"
+)
+llm_request_duration = registry.histogram(
+    "llm_request_duration_seconds", "Upstream LLM call latency", ("kind", "outcome")
+)
+password_hash_duration = registry.histogram(
+    "password_hash_duration_seconds", "bcrypt hash/verify latency including queueing", ("operation",)
+)
+smtp_send_duration = registry.histogram(
+    "smtp_send_duration_seconds", "SMTP send latency", ("outcome",)
+)
+chats_in_flight = registry.gauge("chats_in_flight", "Chat requests currently being handled")
+
+
+def instrument_engine(engine):
+    """Time every statement executed by a (sync) SQLAlchemy engine"""
+    from sqlalchemy import event
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        db_query_duration.observe(time.perf_counter() - conn.info["query_start"].pop())
+    
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        # A failed statement never reaches after_cursor_execute; drop its start time
+        conn = exception_context.connection
+        if conn is not None and exception_context.statement is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+
+def instrument_pool(engine, gauge: Gauge):
+    """Track connections checked out of an engine's pool, whatever the pool class"""
+    from sqlalchemy import event
+    
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, connection_record, connection_proxy):
+        gauge.inc()
+    
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, connection_record):
+        gauge.dec()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording request latency per route template"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        status_code = "500"
+        
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = str(message["status"])
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Label by route template, not raw path, to keep cardinality bounded
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            http_request_duration.observe(time.perf_counter() - start, scope["method"], path, status_code)
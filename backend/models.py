@@ -1,6 +1,6 @@
 """Database models"""
 
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Index, LargeBinary
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from backend.database import Base
@@ -25,6 +25,9 @@ class User(Base):
 class ChatSession(Base):
     """Chat session history for each user"""
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        Index("ix_chat_sessions_user_created", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -34,11 +37,16 @@ class ChatSession(Base):
     # Relationships
     user = relationship("User", back_populates="chat_sessions")
     messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
+    summary = relationship("ChatSummary", back_populates="session", uselist=False, cascade="all, delete-orphan")
+    archives = relationship("ChatArchive", back_populates="session", cascade="all, delete-orphan")
 
 
 class ChatMessage(Base):
     """Individual chat messages"""
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_session_created", "session_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(Integer, ForeignKey("chat_sessions.id"), nullable=False)
@@ -50,9 +58,50 @@ class ChatMessage(Base):
     session = relationship("ChatSession", back_populates="messages")
 
 
+class ChatSummary(Base):
+    """Rolling summary of the older messages in a chat session"""
+    __tablename__ = "chat_summaries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("chat_sessions.id"), unique=True, index=True, nullable=False)
+    summary = Column(Text, nullable=False)
+    summarized_until_id = Column(Integer, nullable=False)  # last ChatMessage.id folded into the summary
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    session = relationship("ChatSession", back_populates="summary")
+
+
+class ChatArchive(Base):
+    """Compressed segment of messages moved out of chat_messages from an inactive session"""
+    __tablename__ = "chat_archives"
+    __table_args__ = (
+        Index("ix_chat_archives_user_session", "user_id", "session_id"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(Integer, ForeignKey("chat_sessions.id"), index=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    codec = Column(String(10), nullable=False)  # 'zstd' or 'zlib'
+    payload = Column(LargeBinary(length=2 ** 24), nullable=False)  # compressed JSON lines
+    message_count = Column(Integer, nullable=False)
+    first_message_at = Column(DateTime, nullable=False)
+    last_message_at = Column(DateTime, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Relationships
+    session = relationship("ChatSession", back_populates="archives")
+
+
 class VerificationToken(Base):
     """Email verification and password reset tokens"""
     __tablename__ = "verification_tokens"
+    __table_args__ = (
+        # Deleting a user's outstanding tokens on resend / forgot-password
+        Index("ix_verification_tokens_user_type_used", "user_id", "token_type", "used"),
+        # The sweeper's used and expired passes
+        Index("ix_verification_tokens_used_expires", "used", "expires_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -65,3 +114,21 @@ class VerificationToken(Base):
     # Relationships
     user = relationship("User", back_populates="verification_tokens")
 
+
+class EmailOutbox(Base):
+    """Outgoing emails waiting to be delivered by the background sender"""
+    __tablename__ = "email_outbox"
+    __table_args__ = (
+        Index("ix_email_outbox_status_next_attempt", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_email = Column(String(100), nullable=False)
+    subject = Column(String(255), nullable=False)
+    html_content = Column(Text, nullable=False)
+    status = Column(String(20), default="pending", nullable=False)  # 'pending', 'sent' or 'failed'
+    attempts = Column(Integer, default=0, nullable=False)
+    next_attempt_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
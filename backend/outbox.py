@@ -0,0 +1,132 @@
+"""Background sender that delivers queued emails from the outbox table"""
+
+import asyncio
+import os
+import random
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select, update
+
+from backend.database import AsyncSessionLocal
+from backend.email_service import SMTPConnection
+from backend.models import EmailOutbox
+
+# Sender configuration
+OUTBOX_ENABLED = os.getenv("EMAIL_OUTBOX_ENABLED", "true").lower() == "true"
+OUTBOX_POLL_INTERVAL = float(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", "5"))
+OUTBOX_BATCH_SIZE = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "20"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_RETRY_BASE = float(os.getenv("EMAIL_OUTBOX_RETRY_BASE", "10"))  # seconds
+OUTBOX_RETRY_MAX = float(os.getenv("EMAIL_OUTBOX_RETRY_MAX", "3600"))  # seconds
+OUTBOX_LEASE = float(os.getenv("EMAIL_OUTBOX_LEASE", "120"))  # seconds a claimed row stays reserved
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter for the given number of failed attempts"""
+    delay = min(OUTBOX_RETRY_MAX, OUTBOX_RETRY_BASE * (2 ** (attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class OutboxSender:
+    """Delivers pending outbox rows over one reused SMTP connection"""
+    
+    def __init__(self):
+        self._connection = SMTPConnection()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.failed = 0
+    
+    def start(self):
+        """Start the sender loop on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the sender loop and close the SMTP connection"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.get_running_loop().run_in_executor(None, self._connection.close)
+    
+    def notify(self):
+        """Wake the sender after new emails were committed"""
+        self._wakeup.set()
+    
+    async def _run(self):
+        while True:
+            try:
+                processed = await self.process_batch()
+            except Exception as e:
+                print(f"❌ Email outbox error: {str(e)}")
+                processed = 0
+            
+            # Keep draining while there is work, otherwise wait for a nudge
+            if processed < OUTBOX_BATCH_SIZE:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=OUTBOX_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+    
+    async def _claim(self, db, row: EmailOutbox, now: datetime) -> bool:
+        # Reserve the row so other workers skip it; the lease expires if we crash
+        result = await db.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id == row.id, EmailOutbox.next_attempt_at == row.next_attempt_at)
+            .values(next_attempt_at=now + timedelta(seconds=OUTBOX_LEASE))
+        )
+        await db.commit()
+        return result.rowcount == 1
+    
+    async def process_batch(self) -> int:
+        """Send one batch of due emails, returning how many were attempted"""
+        loop = asyncio.get_running_loop()
+        now = datetime.utcnow()
+        
+        async with AsyncSessionLocal() as db:
+            rows = (await db.scalars(
+                select(EmailOutbox)
+                .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+                .order_by(EmailOutbox.next_attempt_at)
+                .limit(OUTBOX_BATCH_SIZE)
+            )).all()
+            
+            processed = 0
+            for row in rows:
+                if not await self._claim(db, row, now):
+                    continue
+                processed += 1
+                
+                try:
+                    await loop.run_in_executor(
+                        None, self._connection.send, row.to_email, row.subject, row.html_content
+                    )
+                    row.status = "sent"
+                    row.sent_at = datetime.utcnow()
+                    self.sent += 1
+                    
+                except Exception as e:
+                    # Drop the connection so the next attempt starts fresh
+                    await loop.run_in_executor(None, self._connection.close)
+                    row.attempts += 1
+                    row.last_error = str(e)
+                    if row.attempts >= OUTBOX_MAX_ATTEMPTS:
+                        row.status = "failed"
+                        self.failed += 1
+                        print(f"❌ Giving up on email to {row.to_email}: {str(e)}")
+                    else:
+                        row.next_attempt_at = datetime.utcnow() + timedelta(seconds=retry_delay(row.attempts))
+                
+                await db.commit()
+            
+            return processed
+
+
+# Shared sender for this process
+outbox_sender = OutboxSender()
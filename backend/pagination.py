@@ -0,0 +1,44 @@
+"""Keyset (cursor) pagination on (created_at, id)"""
+
+import base64
+import os
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+
+# Page sizes for the session and message listings
+PAGE_SIZE = int(os.getenv("PAGE_SIZE", "20"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "100"))
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """Opaque cursor pointing just past a row"""
+    raw = f"{created_at.isoformat()}|{id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """Parse a cursor from a previous page; a malformed one is a 400"""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def older_than(created_at_column, id_column, cursor: Tuple[datetime, int]):
+    """Rows before the cursor in (created_at, id) descending order.
+
+    The leading `created_at <= ?` lets the database seek straight to the
+    cursor in a (..., created_at) index instead of filtering from the top.
+    """
+    created_at, id = cursor
+    return and_(
+        created_at_column <= created_at,
+        or_(created_at_column < created_at, id_column < id),
+    )
@@ -0,0 +1,79 @@
+"""Opt-in cache of fortune teller replies to repeatable first messages"""
+
+import os
+import re
+from datetime import datetime
+from typing import Optional, Tuple
+
+from backend.cache import TTLCache
+
+# Cache settings
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() == "true"
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))  # seconds
+
+
+def normalize_message(message: str) -> str:
+    """Normalize case, whitespace and trailing punctuation so near-identical prompts match"""
+    message = re.sub(r"\s+", " ", message.strip().lower())
+    return message.rstrip(" .!?")
+
+
+def response_cache_key(
+    zodiac_sign: Optional[str],
+    message: str,
+    model: str,
+    temperature: float,
+    max_tokens: int,
+) -> Tuple:
+    """Key a first-turn prompt by sign, normalized message, day and model parameters"""
+    return (
+        (zodiac_sign or "").strip().lower(),
+        normalize_message(message),
+        datetime.utcnow().date().isoformat(),
+        model,
+        temperature,
+        max_tokens,
+    )
+
+
+class ResponseCache:
+    """LRU/TTL cache of replies that tracks the upstream calls and latency it saved"""
+    
+    def __init__(self, enabled: bool, maxsize: int, ttl: float):
+        self.enabled = enabled
+        self._cache = TTLCache(maxsize, ttl)
+        self.upstream_calls_saved = 0
+        self.latency_saved = 0.0
+    
+    def get(self, key: Tuple) -> Optional[str]:
+        """Return a cached reply, counting the upstream call it replaces"""
+        if not self.enabled:
+            return None
+        
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        
+        response, latency = entry
+        self.upstream_calls_saved += 1
+        self.latency_saved += latency
+        return response
+    
+    def set(self, key: Tuple, response: str, latency: float):
+        """Store a reply with the upstream latency it took to produce"""
+        if self.enabled:
+            self._cache.set(key, (response, latency))
+    
+    def stats(self) -> dict:
+        """Cache counters plus upstream calls and seconds saved"""
+        return {
+            "enabled": self.enabled,
+            **self._cache.stats(),
+            "upstream_calls_saved": self.upstream_calls_saved,
+            "latency_saved_seconds": round(self.latency_saved, 3),
+        }
+
+
+# Shared cache for this process
+response_cache = ResponseCache(RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
@@ -1,7 +1,7 @@
 """Pydantic schemas for request/response validation"""
 
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -36,9 +36,10 @@ class Token(BaseModel):
 
 # Chat schemas
 class ChatRequest(BaseModel):
-    message: str
+    message: str = Field(..., max_length=4000)
     sessionId: Optional[str] = None
     zodiacSign: Optional[str] = None
+    noCache: bool = False
 
 
 class ChatResponse(BaseModel):
@@ -50,10 +51,32 @@ class ClearHistoryRequest(BaseModel):
     sessionId: str
 
 
+class SessionItem(BaseModel):
+    sessionId: str
+    createdAt: datetime
+
+
+class SessionListResponse(BaseModel):
+    sessions: List[SessionItem]
+    nextCursor: Optional[str] = None
+
+
+class MessageItem(BaseModel):
+    role: str
+    content: str
+    createdAt: datetime
+
+
+class MessageListResponse(BaseModel):
+    messages: List[MessageItem]  # oldest first within the page
+    nextCursor: Optional[str] = None  # fetches the older messages
+
+
 # Health check
 class HealthResponse(BaseModel):
     status: str
     message: str
     hasApiKey: bool
     database_connected: bool
+    llmCircuit: str
 
@@ -1,35 +1,61 @@
 """Main FastAPI server with authentication and chat functionality"""
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
-from sqlalchemy.orm import Session
-from openai import OpenAI
-from dotenv import load_dotenv
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy import select, insert, delete, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+import math
 import os
+import time
+import anyio
 from datetime import datetime, timedelta
+from typing import Optional
 
-from backend.database import get_db, engine, Base
-from backend.models import User, ChatSession, ChatMessage, VerificationToken
+from backend.database import get_async_db, AsyncSessionLocal
+from backend.models import User, ChatSession, ChatMessage, ChatSummary, ChatArchive, VerificationToken
 from backend.schemas import (
     UserCreate, UserLogin, UserResponse, Token,
-    ChatRequest, ChatResponse, ClearHistoryRequest, HealthResponse
+    ChatRequest, ChatResponse, ClearHistoryRequest, HealthResponse,
+    SessionItem, SessionListResponse, MessageItem, MessageListResponse
 )
 from backend.auth import (
-    get_password_hash, verify_password, create_access_token,
-    get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
+    get_password_hash_async, verify_and_update_password, create_access_token,
+    get_current_user, invalidate_user, auth_cache_stats, ACCESS_TOKEN_EXPIRE_MINUTES
 )
-from backend.email_service import send_verification_email, send_password_reset_email
+from backend.email_service import queue_verification_email, queue_password_reset_email
+from backend.outbox import outbox_sender, OUTBOX_ENABLED
+from backend.sweeper import token_sweeper, TOKEN_SWEEP_ENABLED
+from backend.archive import archive_job, archived_messages, rehydrate_session, ARCHIVE_ENABLED
+from backend.pagination import encode_cursor, decode_cursor, older_than, PAGE_SIZE, MAX_PAGE_SIZE
+from backend.history import load_recent_history
+from backend.summarizer import compact_session, summary_message
+from backend.fortune import get_daily_fortunes, seconds_until_midnight
+from backend.response_cache import response_cache, response_cache_key
+from backend.coalesce import coalescer
+from backend.admission import chat_admission
+from backend.circuit_breaker import CircuitOpen, llm_breaker
+from backend.static_assets import get_assets
+from backend.compression import CompressionMiddleware, COMPRESSION_ENABLED
+from backend.fast_json import DefaultResponse, model_response, dumps
+from backend import database, llm, metrics
 import secrets
 
-# Load environment variables
-load_dotenv()
-
 # Note: Tables are created by init_db.py script
 # Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Fortune Teller API", version="2.0.0")
+app = FastAPI(title="Fortune Teller API", version="2.0.0", default_response_class=DefaultResponse)
+
+# Record per-route latency histograms
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+# Gzip larger API responses (streams and precompressed assets pass through)
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -40,12 +66,39 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize OpenAI
-try:
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-except Exception as e:
-    print(f"⚠️  OpenAI client initialization failed: {e}")
-    client = None
+
+@app.on_event("startup")
+async def startup():
+    """Load the frontend, start background workers and optionally prewarm connections"""
+    get_assets()
+    if database.DB_PREWARM_CONNECTIONS:
+        await database.prewarm()
+    if llm.LLM_PREWARM_CONNECTIONS:
+        await llm.prewarm()
+    # Claims keep outbox senders from sending twice, so every worker runs one; the
+    # sweeper and archive job run only in the first worker (the launcher sets WORKER_INDEX)
+    if OUTBOX_ENABLED:
+        outbox_sender.start()
+    if os.getenv("WORKER_INDEX", "0") == "0":
+        if TOKEN_SWEEP_ENABLED:
+            token_sweeper.start()
+        if ARCHIVE_ENABLED:
+            archive_job.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background workers and release the pooled upstream connections"""
+    await outbox_sender.stop()
+    await token_sweeper.stop()
+    await archive_job.stop()
+    await llm.close_client()
+
+
+# Chat completion parameters
+CHAT_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+CHAT_TEMPERATURE = 0.8
+CHAT_MAX_TOKENS = 500
 
 # System prompt for the fortune teller AI
 FORTUNE_TELLER_PROMPT = """You are Celestia, a revered master fortune teller and cosmic oracle with centuries of wisdom in astrology, divination, tarot, numerology, and esoteric knowledge. You are highly respected for your accuracy and profound insights.
@@ -97,25 +150,25 @@ Remember: You are a bridge between the mundane and the mystical. Every word shou
 # ===== AUTHENTICATION ROUTES =====
 
 @app.post("/api/auth/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     
     # Check if username exists
-    if db.query(User).filter(User.username == user_data.username).first():
+    if await db.scalar(select(User).filter(User.username == user_data.username)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
     
     # Check if email exists
-    if db.query(User).filter(User.email == user_data.email).first():
+    if await db.scalar(select(User).filter(User.email == user_data.email)):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
     # Create new user (not verified yet)
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash_async(user_data.password)
     new_user = User(
         username=user_data.username,
         email=user_data.email,
@@ -124,8 +177,8 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     )
     
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     
     # Create verification token
     token = secrets.token_urlsafe(32)
@@ -136,14 +189,11 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         expires_at=datetime.utcnow() + timedelta(hours=24)
     )
     db.add(verification_token)
-    db.commit()
     
-    # Send verification email (don't fail if email sending fails)
-    try:
-        send_verification_email(new_user.email, new_user.username, token)
-    except Exception as e:
-        print(f"⚠️  Failed to send verification email: {str(e)}")
-        # Continue with registration even if email fails
+    # Queue verification email; the outbox sender delivers it in the background
+    queue_verification_email(db, new_user.email, new_user.username, token)
+    await db.commit()
+    outbox_sender.notify()
     
     # Create access token
     access_token = create_access_token(
@@ -151,54 +201,64 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     
-    return Token(
+    return model_response(Token(
         access_token=access_token,
         user=UserResponse.model_validate(new_user)
-    )
+    ), status_code=status.HTTP_201_CREATED)
 
 
 @app.post("/api/auth/login", response_model=Token)
-async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login user"""
     
     # Find user
-    user = db.query(User).filter(User.username == credentials.username).first()
+    user = await db.scalar(select(User).filter(User.username == credentials.username))
+    
+    valid, new_hash = False, None
+    if user:
+        valid, new_hash = await verify_and_update_password(credentials.password, user.hashed_password)
     
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Transparently upgrade hashes made with an outdated bcrypt cost
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+        invalidate_user(user.username)
+    
     # Create access token
     access_token = create_access_token(
         data={"sub": user.username},
         expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     
-    return Token(
+    return model_response(Token(
         access_token=access_token,
         user=UserResponse.model_validate(user)
-    )
+    ))
 
 
 @app.get("/api/auth/me", response_model=UserResponse)
 async def get_me(current_user: User = Depends(get_current_user)):
     """Get current user information"""
-    return UserResponse.model_validate(current_user)
+    return model_response(UserResponse.model_validate(current_user))
 
 
 @app.get("/api/auth/verify-email")
-async def verify_email(token: str, db: Session = Depends(get_db)):
+async def verify_email(token: str, db: AsyncSession = Depends(get_async_db)):
     """Verify email address with token"""
     
     # Find verification token
-    verification = db.query(VerificationToken).filter(
+    verification = await db.scalar(select(VerificationToken).filter(
         VerificationToken.token == token,
         VerificationToken.token_type == "email_verification",
         VerificationToken.used == False
-    ).first()
+    ))
     
     if not verification:
         raise HTTPException(
@@ -214,31 +274,32 @@ async def verify_email(token: str, db: Session = Depends(get_db)):
         )
     
     # Mark user as verified
-    user = db.query(User).filter(User.id == verification.user_id).first()
+    user = await db.get(User, verification.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
     user.is_verified = True
     verification.used = True
     
-    db.commit()
+    await db.commit()
+    invalidate_user(user.username)
     
     return {"message": "Email verified successfully! You can now use all features."}
 
 
 @app.post("/api/auth/resend-verification")
-async def resend_verification(current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def resend_verification(current_user: User = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
     """Resend verification email"""
     
     if current_user.is_verified:
         return {"message": "Email already verified"}
     
     # Delete old unused tokens
-    db.query(VerificationToken).filter(
+    await db.execute(delete(VerificationToken).filter(
         VerificationToken.user_id == current_user.id,
         VerificationToken.token_type == "email_verification",
         VerificationToken.used == False
-    ).delete()
+    ))
     
     # Create new verification token
     token = secrets.token_urlsafe(32)
@@ -249,30 +310,31 @@ async def resend_verification(current_user: User = Depends(get_current_user), db
         expires_at=datetime.utcnow() + timedelta(hours=24)
     )
     db.add(verification_token)
-    db.commit()
     
-    # Send verification email
-    send_verification_email(current_user.email, current_user.username, token)
+    # Queue verification email
+    queue_verification_email(db, current_user.email, current_user.username, token)
+    await db.commit()
+    outbox_sender.notify()
     
     return {"message": "Verification email sent! Please check your inbox."}
 
 
 @app.post("/api/auth/forgot-password")
-async def forgot_password(email: str, db: Session = Depends(get_db)):
+async def forgot_password(email: str, db: AsyncSession = Depends(get_async_db)):
     """Request password reset"""
     
-    user = db.query(User).filter(User.email == email).first()
+    user = await db.scalar(select(User).filter(User.email == email))
     
     # Always return success to prevent email enumeration
     if not user:
         return {"message": "If that email exists, a password reset link has been sent."}
     
     # Delete old unused reset tokens
-    db.query(VerificationToken).filter(
+    await db.execute(delete(VerificationToken).filter(
         VerificationToken.user_id == user.id,
         VerificationToken.token_type == "password_reset",
         VerificationToken.used == False
-    ).delete()
+    ))
     
     # Create password reset token
     token = secrets.token_urlsafe(32)
@@ -283,16 +345,17 @@ async def forgot_password(email: str, db: Session = Depends(get_db)):
         expires_at=datetime.utcnow() + timedelta(hours=1)  # 1 hour expiry
     )
     db.add(reset_token)
-    db.commit()
     
-    # Send password reset email
-    send_password_reset_email(user.email, user.username, token)
+    # Queue password reset email
+    queue_password_reset_email(db, user.email, user.username, token)
+    await db.commit()
+    outbox_sender.notify()
     
     return {"message": "If that email exists, a password reset link has been sent."}
 
 
 @app.post("/api/auth/reset-password")
-async def reset_password(token: str, new_password: str, db: Session = Depends(get_db)):
+async def reset_password(token: str, new_password: str, db: AsyncSession = Depends(get_async_db)):
     """Reset password with token"""
     
     if len(new_password) < 6:
@@ -302,11 +365,11 @@ async def reset_password(token: str, new_password: str, db: Session = Depends(ge
         )
     
     # Find reset token
-    reset = db.query(VerificationToken).filter(
+    reset = await db.scalar(select(VerificationToken).filter(
         VerificationToken.token == token,
         VerificationToken.token_type == "password_reset",
         VerificationToken.used == False
-    ).first()
+    ))
     
     if not reset:
         raise HTTPException(
@@ -322,193 +385,554 @@ async def reset_password(token: str, new_password: str, db: Session = Depends(ge
         )
     
     # Update password
-    user = db.query(User).filter(User.id == reset.user_id).first()
+    user = await db.get(User, reset.user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    user.hashed_password = get_password_hash(new_password)
+    user.hashed_password = await get_password_hash_async(new_password)
     reset.used = True
     
-    db.commit()
+    await db.commit()
+    invalidate_user(user.username)
     
     return {"message": "Password reset successfully! You can now login with your new password."}
 
 
 # ===== CHAT ROUTES =====
 
-@app.post("/api/chat", response_model=ChatResponse)
-async def chat(
+class ChatTurn:
+    """What a chat turn read from the database, carried across the upstream call"""
+    
+    def __init__(self, session_id: str, session_pk: Optional[int], history: list, user_message: str,
+                 first_turn: bool):
+        self.session_id = session_id
+        self.session_pk = session_pk  # None until a new session is saved
+        self.history = history
+        self.user_message = user_message
+        self.first_turn = first_turn  # nothing stored for the session yet
+
+
+async def prepare_chat_turn(
     request: ChatRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Handle chat messages from the fortune teller interface"""
+    user_id: int,
+    db: AsyncSession,
+    background_tasks: BackgroundTasks
+) -> ChatTurn:
+    """Load the chat session and history; nothing is written until save_chat_turn"""
     
     if not request.message:
         raise HTTPException(status_code=400, detail="Message is required")
     
-    # Get or create chat session
+    session_pk, summary, summarized_until_id, archived = None, None, 0, False
     session_id = request.sessionId
     if not session_id:
         import uuid
         session_id = str(uuid.uuid4())
-    
-    chat_session = db.query(ChatSession).filter(
-        ChatSession.session_id == session_id,
-        ChatSession.user_id == current_user.id
-    ).first()
-    
-    if not chat_session:
-        chat_session = ChatSession(
-            user_id=current_user.id,
-            session_id=session_id
+    else:
+        row = (await db.execute(
+            select(
+                ChatSession.id, ChatSummary.summary, ChatSummary.summarized_until_id,
+                select(ChatArchive.id).filter(ChatArchive.session_id == ChatSession.id).exists()
+            )
+            .outerjoin(ChatSummary, ChatSummary.session_id == ChatSession.id)
+            .filter(
+                ChatSession.session_id == session_id,
+                ChatSession.user_id == user_id
+            )
+        )).first()
+        if row:
+            session_pk, summary, summarized_until_id, archived = row
+    
+    # Get the most recent conversation history that fits the prompt budget,
+    # preceded by the summary of everything older
+    history, truncated = [], False
+    if session_pk is not None:
+        if archived:
+            # Bring archived messages back, even if the session got new ones while
+            # it was being archived, so they are part of the context again
+            restored_until_id = await rehydrate_session(db, session_pk, summarized_until_id or 0)
+            if restored_until_id is not None:
+                summarized_until_id = restored_until_id
+        history, truncated = await load_recent_history(
+            db, session_pk, after_id=summarized_until_id or 0
         )
-        db.add(chat_session)
-        db.commit()
-        db.refresh(chat_session)
-    
-    # Get conversation history
-    messages = db.query(ChatMessage).filter(
-        ChatMessage.session_id == chat_session.id
-    ).order_by(ChatMessage.created_at).limit(10).all()
-    
-    history = [{"role": msg.role, "content": msg.content} for msg in messages]
+    # An empty window alone is not enough: one long message can use up the whole budget
+    first_turn = session_pk is None or not (history or truncated or summary)
+    if summary:
+        history.insert(0, summary_message(summary))
     
     # Add context about zodiac sign if provided
     context_message = request.message
-    if request.zodiacSign and len(history) == 0:
+    if request.zodiacSign and first_turn:
         context_message = f"My zodiac sign is {request.zodiacSign}. {request.message}"
     
-    # Save user message
-    user_message = ChatMessage(
-        session_id=chat_session.id,
-        role="user",
-        content=context_message
-    )
-    db.add(user_message)
-    
     # Add to history
     history.append({"role": "user", "content": context_message})
     
+    # Fold older turns into the summary once they no longer fit the window
+    if truncated:
+        background_tasks.add_task(compact_session, session_pk)
+    
+    return ChatTurn(session_id, session_pk, history, context_message, first_turn)
+
+
+async def save_chat_turn(db: AsyncSession, user_id: int, turn: ChatTurn, ai_response: Optional[str]):
+    """Create the session if needed and store both messages in one transaction"""
+    
+    session_pk = turn.session_pk
+    if session_pk is None:
+        chat_session = ChatSession(user_id=user_id, session_id=turn.session_id)
+        db.add(chat_session)
+        try:
+            await db.flush()
+            session_pk = chat_session.id
+        except IntegrityError:
+            # Another request created this session first
+            await db.rollback()
+            session_pk = await db.scalar(select(ChatSession.id).filter(
+                ChatSession.session_id == turn.session_id,
+                ChatSession.user_id == user_id
+            ))
+            if session_pk is None:
+                raise HTTPException(status_code=404, detail="Chat session not found")
+    
+    # One multi-row INSERT; the new ids are not needed
+    messages = [{"session_id": session_pk, "role": "user", "content": turn.user_message}]
+    if ai_response:
+        messages.append({"session_id": session_pk, "role": "assistant", "content": ai_response})
+    await db.execute(insert(ChatMessage), messages)
+    await db.commit()
+
+
+def upstream_error(e: Exception) -> HTTPException:
+    """Map an upstream LLM failure to an HTTP error"""
+    if isinstance(e, HTTPException):
+        return e
+    
+    if isinstance(e, CircuitOpen):
+        return HTTPException(
+            status_code=503,
+            detail="The fortune teller is temporarily unavailable. Please try again shortly.",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        )
+    
+    if isinstance(e, llm.UpstreamError):
+        if e.timed_out:
+            return HTTPException(
+                status_code=504,
+                detail="The fortune teller took too long to answer. Please try again."
+            )
+        return HTTPException(
+            status_code=502,
+            detail="The fortune teller could not be reached. Please try again.",
+            headers={"Retry-After": str(math.ceil(e.retry_after))} if e.retry_after else None
+        )
+    
+    if "invalid_api_key" in str(e).lower():
+        return HTTPException(
+            status_code=401,
+            detail="Invalid API key. Please check your OpenAI API key in the .env file."
+        )
+    
+    return HTTPException(
+        status_code=500,
+        detail="Failed to get response from fortune teller. Please try again."
+    )
+
+
+def first_turn_key(request: ChatRequest, turn: ChatTurn) -> Optional[tuple]:
+    """Key for a history-less prompt, shared by the response cache and request
+    coalescing, or None if the reply must be generated just for this request"""
+    if request.noCache or not turn.first_turn:
+        return None
+    return response_cache_key(
+        request.zodiacSign, request.message, CHAT_MODEL, CHAT_TEMPERATURE, CHAT_MAX_TOKENS
+    )
+
+
+@app.post("/api/chat", response_model=ChatResponse)
+async def chat(
+    request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Handle chat messages from the fortune teller interface"""
+    
+    user_id = current_user.id
+    chat_admission.check_user(user_id)
+    
+    turn = await prepare_chat_turn(request, user_id, db, background_tasks)
+    history = turn.history
+    
+    # End the read transaction so no connection is held during the upstream call
+    await db.commit()
+    
+    metrics.chats_in_flight.inc()
     try:
         # Check if OpenAI client is available
-        if not client:
+        if not llm.is_available():
             raise HTTPException(status_code=503, detail="AI service temporarily unavailable")
         
-        # Call OpenAI API
-        completion = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": FORTUNE_TELLER_PROMPT},
-                *history
-            ],
-            temperature=0.8,
-            max_tokens=500
-        )
+        # Serve repeatable first-turn prompts from the response cache
+        cache_key = first_turn_key(request, turn)
+        ai_response = response_cache.get(cache_key) if cache_key else None
         
-        ai_response = completion.choices[0].message.content
+        if ai_response is None:
+            async def complete():
+                # Fail fast instead of queueing for a slot while the upstream is down
+                llm_breaker.check()
+                # Wait for an upstream slot, then call OpenAI without blocking the event loop
+                async with chat_admission.slot():
+                    started = time.perf_counter()
+                    response = await llm.chat_completion(
+                        messages=[
+                            {"role": "system", "content": FORTUNE_TELLER_PROMPT},
+                            *history
+                        ],
+                        model=CHAT_MODEL,
+                        temperature=CHAT_TEMPERATURE,
+                        max_tokens=CHAT_MAX_TOKENS
+                    )
+                if cache_key:
+                    response_cache.set(cache_key, response, time.perf_counter() - started)
+                return response
+            
+            # Identical first-turn prompts already in flight share one upstream call
+            if cache_key:
+                ai_response = await coalescer.run(cache_key, complete)
+            else:
+                ai_response = await complete()
         
-        # Save AI response
-        ai_message = ChatMessage(
-            session_id=chat_session.id,
-            role="assistant",
-            content=ai_response
-        )
-        db.add(ai_message)
-        db.commit()
+        # Save the session and both messages in one short transaction
+        await save_chat_turn(db, user_id, turn, ai_response)
         
-        return ChatResponse(response=ai_response, sessionId=session_id)
+        return model_response(ChatResponse(response=ai_response, sessionId=turn.session_id))
         
     except Exception as e:
-        error_message = str(e)
+        raise upstream_error(e)
+    
+    finally:
+        metrics.chats_in_flight.dec()
+
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Format a Server-Sent Event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {dumps(data)}\n\n"
+
+
+@app.post("/api/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stream the fortune teller's reply as Server-Sent Events"""
+    
+    user_id = current_user.id
+    chat_admission.check_user(user_id)
+    
+    # The slot is held for the whole stream; take it before any work so a
+    # rejected request leaves nothing behind
+    ticket = await chat_admission.admit()
+    try:
+        turn = await prepare_chat_turn(request, user_id, db, background_tasks)
+        history = turn.history
         
-        if "invalid_api_key" in error_message.lower():
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid API key. Please check your OpenAI API key in the .env file."
-            )
+        if not llm.is_available():
+            raise HTTPException(status_code=503, detail="AI service temporarily unavailable")
         
-        raise HTTPException(
-            status_code=500,
-            detail="Failed to get response from fortune teller. Please try again."
-        )
+        cache_key = first_turn_key(request, turn)
+        cached = response_cache.get(cache_key) if cache_key else None
+        if cached is not None:
+            ticket.release()
+        else:
+            try:
+                llm_breaker.check()
+            except CircuitOpen as e:
+                raise upstream_error(e)
+        
+        # End the read transaction so no connection is held while streaming
+        await db.commit()
+    except BaseException:
+        ticket.release()
+        raise
+    
+    async def event_stream():
+        chunks = []
+        metrics.chats_in_flight.inc()
+        try:
+            if cached is not None:
+                chunks.append(cached)
+                yield sse_event({"token": cached})
+            else:
+                started = time.perf_counter()
+                async for token in llm.stream_chat_completion(
+                    messages=[
+                        {"role": "system", "content": FORTUNE_TELLER_PROMPT},
+                        *history
+                    ],
+                    model=CHAT_MODEL,
+                    temperature=CHAT_TEMPERATURE,
+                    max_tokens=CHAT_MAX_TOKENS
+                ):
+                    chunks.append(token)
+                    yield sse_event({"token": token})
+                
+                # Only complete replies are cached
+                if cache_key:
+                    response_cache.set(cache_key, "".join(chunks), time.perf_counter() - started)
+            
+            yield sse_event({"sessionId": turn.session_id}, event="done")
+            
+        except Exception as e:
+            # A client disconnect cancels the generator; only report real errors
+            yield sse_event({"detail": upstream_error(e).detail}, event="error")
+            
+        finally:
+            metrics.chats_in_flight.dec()
+            ticket.release()
+            
+            # Save the turn with whatever was generated, even if the client went away;
+            # like /api/chat, a turn with no reply at all is not stored
+            if chunks:
+                with anyio.CancelScope(shield=True):
+                    async with AsyncSessionLocal() as save_db:
+                        await save_chat_turn(save_db, user_id, turn, "".join(chunks))
+    
+    # Frees the slot even if the client goes away before the stream starts. It runs
+    # ahead of any compaction prepare_chat_turn scheduled, so a summary call never
+    # holds the slot; an explicit background would replace those tasks entirely.
+    background_tasks.tasks.insert(0, BackgroundTask(ticket.release))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background_tasks
+    )
 
 
 @app.post("/api/clear-history")
 async def clear_history(
     request: ClearHistoryRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Clear conversation history for a session"""
     
-    chat_session = db.query(ChatSession).filter(
+    chat_session = await db.scalar(select(ChatSession).filter(
         ChatSession.session_id == request.sessionId,
         ChatSession.user_id == current_user.id
-    ).first()
+    ))
     
     if chat_session:
-        db.query(ChatMessage).filter(
+        await db.execute(delete(ChatMessage).filter(
             ChatMessage.session_id == chat_session.id
-        ).delete()
-        db.commit()
+        ))
+        await db.execute(delete(ChatSummary).filter(
+            ChatSummary.session_id == chat_session.id
+        ))
+        await db.execute(delete(ChatArchive).filter(
+            ChatArchive.session_id == chat_session.id
+        ))
+        await db.commit()
     
     return {"success": True}
 
 
+@app.get("/api/sessions", response_model=SessionListResponse)
+async def list_sessions(
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """List the user's chat sessions, newest first"""
+    
+    query = select(ChatSession.session_id, ChatSession.created_at, ChatSession.id).filter(
+        ChatSession.user_id == current_user.id
+    )
+    after = decode_cursor(cursor)
+    if after:
+        query = query.filter(older_than(ChatSession.created_at, ChatSession.id, after))
+    
+    # Served by the (user_id, created_at, id) index; one extra row tells if there is a next page
+    rows = (await db.execute(
+        query.order_by(ChatSession.created_at.desc(), ChatSession.id.desc()).limit(limit + 1)
+    )).all()
+    
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    return model_response(SessionListResponse(
+        sessions=[SessionItem(sessionId=row.session_id, createdAt=row.created_at) for row in page],
+        nextCursor=next_cursor
+    ))
+
+
+@app.get("/api/sessions/{session_id}/messages", response_model=MessageListResponse)
+async def list_session_messages(
+    session_id: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Read back a session's messages, newest page first; each page is in chronological order"""
+    
+    session_pk = await db.scalar(select(ChatSession.id).filter(
+        ChatSession.session_id == session_id,
+        ChatSession.user_id == current_user.id
+    ))
+    if session_pk is None:
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    
+    query = select(ChatMessage.role, ChatMessage.content, ChatMessage.created_at, ChatMessage.id).filter(
+        ChatMessage.session_id == session_pk
+    )
+    after = decode_cursor(cursor)
+    if after:
+        query = query.filter(older_than(ChatMessage.created_at, ChatMessage.id, after))
+    query = query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(limit + 1)
+    
+    rows = [row._asdict() for row in (await db.execute(query)).all()]
+    
+    # Archived messages are read in place; only resuming the chat restores them.
+    # When the hot rows fill the page, only segments reaching into it are read.
+    since = rows[limit]["created_at"] if len(rows) > limit else None
+    rows.extend(await archived_messages(db, session_pk, after, limit + 1, since))
+    rows.sort(key=lambda row: (row["created_at"], row["id"]), reverse=True)
+    
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1]["created_at"], page[-1]["id"]) if len(rows) > limit else None
+    return model_response(MessageListResponse(
+        messages=[
+            MessageItem(role=row["role"], content=row["content"], createdAt=row["created_at"])
+            for row in reversed(page)
+        ],
+        nextCursor=next_cursor
+    ))
+
+
+# ===== FORTUNE ROUTES =====
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+@app.get("/api/fortune/{sign}")
+async def get_fortune(sign: str, request: Request):
+    """Today's fortune for a zodiac sign, cacheable until midnight UTC"""
+    
+    daily = get_daily_fortunes()
+    sign = sign.lower()
+    if sign not in daily.bodies:
+        raise HTTPException(status_code=404, detail="Unknown zodiac sign")
+    
+    etag = daily.etags[sign]
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={seconds_until_midnight()}",
+    }
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    
+    return Response(content=daily.bodies[sign], media_type="application/json", headers=headers)
+
+
 # ===== HEALTH CHECK =====
 
 @app.get("/api/health", response_model=HealthResponse)
-async def health_check(db: Session = Depends(get_db)):
+async def health_check(db: AsyncSession = Depends(get_async_db)):
     """Health check endpoint"""
     
     database_connected = False
     try:
         # Try to execute a simple query
-        from sqlalchemy import text
-        db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 1"))
         database_connected = True
     except:
         pass
     
+    # Still 200 while the upstream is down: every instance shares it, so a load
+    # balancer pulling this one would not help
+    llm_circuit = llm_breaker.state
     return HealthResponse(
-        status="ok",
+        status="ok" if llm_circuit == "closed" else "degraded",
         message="Fortune Teller API is running",
         hasApiKey=bool(os.getenv("OPENAI_API_KEY")),
-        database_connected=database_connected
+        database_connected=database_connected,
+        llmCircuit=llm_circuit
     )
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus metrics"""
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/stats")
+async def stats():
+    """In-process cache and worker counters for monitoring"""
+    return {
+        "auth_cache": auth_cache_stats(),
+        "response_cache": response_cache.stats(),
+        "coalescing": coalescer.stats(),
+        "chat_admission": chat_admission.stats(),
+        "llm": llm.stats(),
+        "token_sweeper": token_sweeper.stats(),
+        "chat_archive": archive_job.stats(),
+    }
+
+
 # ===== SERVE FRONTEND =====
 
+def asset_response(file_name: str, request: Request) -> Response:
+    """Serve a frontend asset from memory in the best encoding the client accepts"""
+    assets = get_assets()
+    asset = assets.get(file_name)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="File not found")
+    
+    encoding = asset.choose_encoding(request.headers.get("accept-encoding"))
+    headers = {
+        "ETag": asset.etag(encoding),
+        "Cache-Control": assets.cache_control(file_name),
+        "Vary": "Accept-Encoding",
+    }
+    
+    # Any representation the client holds is still current
+    if_none_match = request.headers.get("if-none-match")
+    if any(etag_matches(if_none_match, etag) for etag in asset.etags()):
+        return Response(status_code=304, headers=headers)
+    
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=asset.encodings[encoding], media_type=asset.content_type, headers=headers)
+
+
 @app.get("/")
-async def read_root():
+async def read_root(request: Request):
     """Serve the main HTML file"""
-    # Get absolute path to frontend directory
-    backend_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(backend_dir)
-    frontend_dir = os.path.join(project_root, "frontend")
-    index_path = os.path.join(frontend_dir, "index.html")
-    return FileResponse(index_path)
+    return asset_response("index.html", request)
 
 
 @app.get("/{file_name}")
-async def serve_frontend_files(file_name: str):
-    """Serve frontend static files (CSS, JS)"""
-    # Only allow specific files
-    if file_name not in ['style.css', 'script.js']:
+async def serve_frontend_files(file_name: str, request: Request):
+    """Serve frontend static files (CSS, JS), including their fingerprinted names"""
+    if file_name == "index.html":
         raise HTTPException(status_code=404, detail="File not found")
-    
-    # Get absolute path to frontend directory
-    backend_dir = os.path.dirname(os.path.abspath(__file__))
-    project_root = os.path.dirname(backend_dir)
-    frontend_dir = os.path.join(project_root, "frontend")
-    file_path = os.path.join(frontend_dir, file_name)
-    
-    if os.path.exists(file_path):
-        return FileResponse(file_path)
-    
-    raise HTTPException(status_code=404, detail="File not found")
+    return asset_response(file_name, request)
 
 
 # Run the server
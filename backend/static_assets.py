@@ -0,0 +1,116 @@
+"""Frontend assets loaded and compressed once, then served from memory"""
+
+import gzip
+import hashlib
+import os
+from typing import Dict, Optional
+
+try:
+    import brotli  # optional: pip install brotli
+except ImportError:
+    brotli = None
+
+FRONTEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "frontend")
+
+# Assets served to browsers; index.html links the others by fingerprinted name
+ASSET_TYPES = {
+    "index.html": "text/html; charset=utf-8",
+    "style.css": "text/css; charset=utf-8",
+    "script.js": "application/javascript; charset=utf-8",
+}
+FINGERPRINTED = ("style.css", "script.js")
+
+# One year; fingerprinted URLs change whenever their content does
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+class Asset:
+    """One file's bytes with its precompressed variants and validators"""
+
+    def __init__(self, name: str, content_type: str, body: bytes):
+        self.name = name
+        self.content_type = content_type
+        self.digest = hashlib.sha256(body).hexdigest()[:16]
+        self.encodings = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.encodings["br"] = brotli.compress(body)
+
+    @property
+    def fingerprinted_name(self) -> str:
+        stem, ext = os.path.splitext(self.name)
+        return f"{stem}.{self.digest[:10]}{ext}"
+
+    def etag(self, encoding: str) -> str:
+        # Each encoding is a different representation and needs its own strong ETag
+        return f'"{self.digest}"' if encoding == "identity" else f'"{self.digest}-{encoding}"'
+
+    def etags(self):
+        return [self.etag(encoding) for encoding in self.encodings]
+
+    def choose_encoding(self, accept_encoding: Optional[str]) -> str:
+        """Pick the smallest encoding the client accepts"""
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.encodings and accepted.get(encoding, accepted.get("*", 0)) > 0:
+                return encoding
+        return "identity"
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}"""
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+class AssetStore:
+    """All frontend assets, keyed by every URL name they are served under"""
+
+    def __init__(self, directory: str):
+        self.assets: Dict[str, Asset] = {}
+        self.immutable = set()
+
+        def read(name):
+            with open(os.path.join(directory, name), "rb") as f:
+                return f.read()
+
+        for name in FINGERPRINTED:
+            asset = Asset(name, ASSET_TYPES[name], read(name))
+            self.assets[name] = asset
+            self.assets[asset.fingerprinted_name] = asset
+            self.immutable.add(asset.fingerprinted_name)
+
+        # Point index.html at the fingerprinted URLs so they can be cached forever
+        html = read("index.html").decode("utf-8")
+        html = html.replace('href="style.css"', f'href="{self.assets["style.css"].fingerprinted_name}"')
+        html = html.replace('src="script.js"', f'src="{self.assets["script.js"].fingerprinted_name}"')
+        self.assets["index.html"] = Asset("index.html", ASSET_TYPES["index.html"], html.encode("utf-8"))
+
+    def get(self, name: str) -> Optional[Asset]:
+        return self.assets.get(name)
+
+    def cache_control(self, name: str) -> str:
+        return IMMUTABLE_CACHE_CONTROL if name in self.immutable else REVALIDATE_CACHE_CONTROL
+
+
+_store: Optional[AssetStore] = None
+
+
+def get_assets() -> AssetStore:
+    """Load and compress the frontend on first use"""
+    global _store
+    if _store is None:
+        _store = AssetStore(FRONTEND_DIR)
+    return _store
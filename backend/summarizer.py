@@ -0,0 +1,114 @@
+"""Rolling summarization of long chat sessions"""
+
+import os
+from typing import Set
+
+from sqlalchemy import select
+
+from backend.database import AsyncSessionLocal
+from backend.models import ChatMessage, ChatSummary
+from backend.history import estimate_tokens, MESSAGE_OVERHEAD_TOKENS
+from backend import llm
+
+# Compaction settings
+COMPACTION_ENABLED = os.getenv("COMPACTION_ENABLED", "true").lower() == "true"
+COMPACTION_KEEP_RECENT = int(os.getenv("COMPACTION_KEEP_RECENT", "6"))  # messages left verbatim
+COMPACTION_MIN_MESSAGES = int(os.getenv("COMPACTION_MIN_MESSAGES", "10"))  # smallest batch worth folding
+COMPACTION_BATCH_MESSAGES = int(os.getenv("COMPACTION_BATCH_MESSAGES", "40"))  # most messages per summary call
+COMPACTION_BATCH_TOKENS = int(os.getenv("COMPACTION_BATCH_TOKENS", "6000"))  # most transcript tokens per call
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", os.getenv("LLM_MODEL", "gpt-4o-mini"))
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "300"))
+
+SUMMARY_PROMPT = """You keep the memory of a conversation between a seeker and Celestia, a fortune teller.
+Merge the existing summary with the new messages into one updated summary.
+Keep the seeker's name, zodiac sign, questions, life circumstances and any readings or advice Celestia gave.
+Write in the third person, in at most two short paragraphs. Output only the summary."""
+
+# Sessions currently being compacted in this process
+_compacting: Set[int] = set()
+
+
+def summary_message(summary: str) -> dict:
+    """Chat message carrying the summary of earlier turns into the prompt"""
+    return {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+
+
+async def compact_session(chat_session_id: int):
+    """Fold all but the most recent messages of a session into its stored summary"""
+    if not COMPACTION_ENABLED or not llm.is_available() or chat_session_id in _compacting:
+        return
+    
+    _compacting.add(chat_session_id)
+    try:
+        # One bounded batch per summary call, oldest first, until caught up
+        while await _fold_next_batch(chat_session_id):
+            pass
+        
+    except Exception as e:
+        print(f"⚠️  Failed to compact chat session {chat_session_id}: {str(e)}")
+    
+    finally:
+        _compacting.discard(chat_session_id)
+
+
+async def _fold_next_batch(chat_session_id: int) -> bool:
+    """Fold the oldest unsummarized batch into the summary; returns True if more may be left"""
+    
+    # Read what needs folding, then release the connection before calling the LLM
+    async with AsyncSessionLocal() as db:
+        existing = await db.scalar(select(ChatSummary).filter(
+            ChatSummary.session_id == chat_session_id
+        ))
+        after_id = existing.summarized_until_id if existing else 0
+        # A batch plus the messages kept verbatim: if the limit is reached,
+        # the whole batch is older than the kept tail
+        limit = COMPACTION_BATCH_MESSAGES + COMPACTION_KEEP_RECENT
+        rows = (await db.execute(
+            select(ChatMessage.id, ChatMessage.role, ChatMessage.content)
+            .filter(ChatMessage.session_id == chat_session_id, ChatMessage.id > after_id)
+            .order_by(ChatMessage.created_at, ChatMessage.id)
+            .limit(limit)
+        )).all()
+    
+    more = len(rows) == limit
+    to_fold = rows[:len(rows) - COMPACTION_KEEP_RECENT]
+    used = 0
+    for i, (_, _, content) in enumerate(to_fold):
+        used += estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS
+        if i and used > COMPACTION_BATCH_TOKENS:
+            to_fold, more = to_fold[:i], True
+            break
+    # A short batch is only worth a call while older messages are still waiting
+    if not to_fold or (not more and len(to_fold) < COMPACTION_MIN_MESSAGES):
+        return False
+    
+    transcript = "\n\n".join(f"{role}: {content}" for _, role, content in to_fold)
+    previous = existing.summary if existing else "(none)"
+    summary = await llm.chat_completion(
+        messages=[
+            {"role": "system", "content": SUMMARY_PROMPT},
+            {"role": "user", "content": f"Existing summary:\n{previous}\n\nNew messages:\n{transcript}"},
+        ],
+        model=SUMMARY_MODEL,
+        temperature=0.3,
+        max_tokens=SUMMARY_MAX_TOKENS,
+    )
+    
+    async with AsyncSessionLocal() as db:
+        record = await db.scalar(select(ChatSummary).filter(
+            ChatSummary.session_id == chat_session_id
+        ))
+        if record is None:
+            if after_id:
+                # The summary was cleared in the meantime
+                return False
+            record = ChatSummary(session_id=chat_session_id)
+            db.add(record)
+        elif record.summarized_until_id != after_id:
+            # Someone else compacted this session in the meantime
+            return False
+        record.summary = summary
+        record.summarized_until_id = to_fold[-1][0]
+        await db.commit()
+    
+    return more
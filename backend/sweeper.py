@@ -0,0 +1,105 @@
+"""Background sweeper that purges used and expired verification tokens"""
+
+import asyncio
+import os
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select
+
+from backend import metrics
+from backend.database import AsyncSessionLocal
+from backend.models import VerificationToken
+
+# Sweeper configuration
+TOKEN_SWEEP_ENABLED = os.getenv("TOKEN_SWEEP_ENABLED", "true").lower() == "true"
+TOKEN_SWEEP_INTERVAL = float(os.getenv("TOKEN_SWEEP_INTERVAL", "3600"))  # seconds between sweeps
+TOKEN_SWEEP_BATCH_SIZE = int(os.getenv("TOKEN_SWEEP_BATCH_SIZE", "500"))
+TOKEN_SWEEP_PAUSE = float(os.getenv("TOKEN_SWEEP_PAUSE", "0.1"))  # seconds between batches
+
+tokens_reclaimed = metrics.registry.counter(
+    "verification_tokens_reclaimed_total", "Used or expired verification tokens deleted by the sweeper"
+)
+
+
+class TokenSweeper:
+    """Deletes dead verification tokens in small batches, one short transaction each"""
+    
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self.runs = 0
+        self.last_run: Optional[datetime] = None
+        self.last_reclaimed = 0
+        self.total_reclaimed = 0
+    
+    def start(self):
+        """Start the sweep loop on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+    
+    async def stop(self):
+        """Stop the sweep loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+    
+    async def _run(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"❌ Token sweeper error: {str(e)}")
+            await asyncio.sleep(TOKEN_SWEEP_INTERVAL)
+    
+    async def _delete_batches(self, *conditions) -> int:
+        deleted = 0
+        while True:
+            async with AsyncSessionLocal() as db:
+                # Pick a batch by primary key so each DELETE touches few rows
+                ids = (await db.scalars(
+                    select(VerificationToken.id).where(*conditions).limit(TOKEN_SWEEP_BATCH_SIZE)
+                )).all()
+                if not ids:
+                    return deleted
+                await db.execute(delete(VerificationToken).where(VerificationToken.id.in_(ids)))
+                await db.commit()
+            
+            deleted += len(ids)
+            if len(ids) < TOKEN_SWEEP_BATCH_SIZE:
+                return deleted
+            # Let other writers take the lock between batches
+            await asyncio.sleep(TOKEN_SWEEP_PAUSE)
+    
+    async def sweep(self) -> int:
+        """Delete all used and expired tokens, returning how many rows were reclaimed"""
+        now = datetime.utcnow()
+        reclaimed = await self._delete_batches(VerificationToken.used == True)
+        reclaimed += await self._delete_batches(
+            VerificationToken.used == False, VerificationToken.expires_at < now
+        )
+        
+        self.runs += 1
+        self.last_run = now
+        self.last_reclaimed = reclaimed
+        self.total_reclaimed += reclaimed
+        if reclaimed:
+            tokens_reclaimed.inc(amount=reclaimed)
+            print(f"🧹 Reclaimed {reclaimed} used or expired verification tokens")
+        return reclaimed
+    
+    def stats(self) -> dict:
+        """Sweep counters for monitoring"""
+        return {
+            "runs": self.runs,
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_reclaimed": self.last_reclaimed,
+            "total_reclaimed": self.total_reclaimed,
+        }
+
+
+# Shared sweeper for this process
+token_sweeper = TokenSweeper()
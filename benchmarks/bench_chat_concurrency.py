@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark /api/chat throughput against a local stub completion server.
+
+Starts benchmarks/stub_llm_server.py with a fixed latency, then drives the
+FastAPI app in-process with increasing numbers of concurrent users. With a
+non-blocking upstream client, throughput should grow roughly linearly with
+concurrency (ideal = users / latency) until LLM_MAX_IN_FLIGHT is reached.
+
+Every chat is sent with noCache, so each one makes its own upstream call
+instead of being served from the response cache or coalesced with an
+identical prompt. Chats release their DB connection during the upstream
+call, so --users is not limited by the pool capacity.
+
+Usage:
+    python benchmarks/bench_chat_concurrency.py --latency 0.5 --users 1 2 4 8 12
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def start_stub(port: int, latency: float) -> subprocess.Popen:
+    """Start the stub LLM server and wait until it accepts connections"""
+    proc = subprocess.Popen([
+        sys.executable, os.path.join(ROOT, "benchmarks", "stub_llm_server.py"),
+        "--port", str(port), "--latency", str(latency),
+    ])
+    deadline = time.time() + 15
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/docs", timeout=0.5)
+            return proc
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError("Stub LLM server did not start")
+
+
+async def run_level(client: httpx.AsyncClient, tokens, users: int, rounds: int) -> float:
+    """Run `rounds` chats for each of `users` concurrent users, return chats/sec"""
+
+    async def user_loop(token: str):
+        for _ in range(rounds):
+            response = await client.post(
+                "/api/chat",
+                # Identical first-turn prompts would otherwise share one upstream call
+                json={"message": "What does today hold?", "noCache": True},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(user_loop(tokens[i]) for i in range(users)))
+    elapsed = time.perf_counter() - start
+    return users * rounds / elapsed
+
+
+async def main_async(args):
+    from backend.database import engine, async_engine, SessionLocal, Base
+    from backend.models import User
+    from backend.auth import create_access_token
+    from backend.server import app
+
+    engine.echo = False
+    async_engine.echo = False
+    Base.metadata.create_all(bind=engine)
+
+    # Create users directly; the hash is never checked in this benchmark
+    max_users = max(args.users)
+    db = SessionLocal()
+    for i in range(max_users):
+        db.add(User(username=f"bench{i}", email=f"bench{i}@example.com",
+                    hashed_password="x", is_verified=True))
+    db.commit()
+    db.close()
+    tokens = [create_access_token({"sub": f"bench{i}"}) for i in range(max_users)]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 timeout=120) as client:
+        print(f"Stub latency: {args.latency:.3f}s, {args.rounds} chats per user\n")
+        print(f"{'users':>6} {'chats/s':>10} {'ideal':>10} {'efficiency':>11}")
+        for users in args.users:
+            throughput = await run_level(client, tokens, users, args.rounds)
+            ideal = users / args.latency
+            print(f"{users:>6} {throughput:>10.2f} {ideal:>10.2f} {throughput / ideal:>10.0%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark /api/chat concurrency")
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 2, 4, 8, 12])
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="fortune_bench_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    os.environ["OPENAI_API_KEY"] = "stub-key"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    # The same users chat at every level, so admission limits would reject them
+    os.environ["CHAT_USER_RATE_PER_MINUTE"] = "0"
+    os.environ["CHAT_QUEUE_LIMIT"] = "100000"
+
+    stub = start_stub(args.port, args.latency)
+    try:
+        asyncio.run(main_async(args))
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    main()
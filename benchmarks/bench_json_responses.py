@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the fast JSON response path.
+
+Runs the same workload twice, in fresh processes with FAST_JSON_ENABLED off
+and on, and reports the CPU time per request for:
+
+    serialize       turning the route's return value into a response, alone;
+                    this is the work the fast path removes
+    request         a full in-process request (auth cache warm; chats go to
+                    the stub LLM server), to show the saving at scale
+
+CPU time is measured with time.process_time in the API process, so the stub
+server's work is not counted. The modes alternate for --rounds rounds and the
+best round of each is reported, which keeps machine noise out of the deltas.
+
+Usage:
+    python benchmarks/bench_json_responses.py --requests 2000 --rounds 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STUB_PORT = 8902
+
+
+def cpu_per_call(total: float, calls: int) -> float:
+    return total / calls * 1_000_000  # microseconds
+
+
+def asgi_get(app, path: str, headers: list):
+    """Call the app directly, without an HTTP client adding its own CPU time"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": b"", "headers": headers, "client": ("127.0.0.1", 0), "server": ("bench", 80),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            assert message["status"] == 200, message
+
+    return app(scope, receive, send)
+
+
+async def measure(requests: int, chats: int) -> dict:
+    import httpx
+    from fastapi.routing import serialize_response
+    from backend.database import engine, SessionLocal, Base
+    from backend.models import User
+    from backend.schemas import ChatResponse, UserResponse
+    from backend.auth import create_access_token
+    from backend.fast_json import FAST_JSON_ENABLED, DefaultResponse, model_response
+    from backend.server import app
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(username="jsonbench", email="jsonbench@example.com", hashed_password="x", is_verified=True)
+    db.add(user)
+    db.commit()
+    access_token = create_access_token({"sub": user.username})
+    returned = {
+        "/api/auth/me": UserResponse.model_validate(user),
+        # About the size of a CHAT_MAX_TOKENS reply
+        "/api/chat": ChatResponse(response="The stars reveal a turning point. " * 60, sessionId="session-1"),
+    }
+    db.close()
+
+    results = {}
+
+    # What each route does with its return value: FastAPI's response_model path or model_response
+    for path, model in returned.items():
+        route = next(r for r in app.routes if getattr(r, "path", None) == path)
+        start = time.process_time()
+        for _ in range(requests):
+            if FAST_JSON_ENABLED:
+                model_response(model).body
+            else:
+                content = await serialize_response(field=route.response_field, response_content=model)
+                DefaultResponse(content).body
+        results[f"serialize {path}"] = cpu_per_call(time.process_time() - start, requests)
+
+    # Whole requests, for scale
+    headers = [(b"host", b"bench"), (b"authorization", f"Bearer {access_token}".encode())]
+    await asgi_get(app, "/api/auth/me", headers)
+    start = time.process_time()
+    for _ in range(requests):
+        await asgi_get(app, "/api/auth/me", headers)
+    results["request /api/auth/me"] = cpu_per_call(time.process_time() - start, requests)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=30) as client:
+        start = time.process_time()
+        for _ in range(chats):
+            response = await client.post(
+                "/api/chat", json={"message": "What does today hold?", "noCache": True},
+                headers={"Authorization": f"Bearer {access_token}"}
+            )
+            response.raise_for_status()
+        results["request /api/chat"] = cpu_per_call(time.process_time() - start, chats)
+    return results
+
+
+def child(args):
+    tmpdir = tempfile.mkdtemp(prefix="fortune_json_bench_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    os.environ["OPENAI_API_KEY"] = "stub-key"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{STUB_PORT}/v1"
+    os.environ["CHAT_USER_RATE_PER_MINUTE"] = "0"
+    results = asyncio.run(measure(args.requests, args.chats))
+    print("RESULT " + json.dumps(results))
+
+
+def run_mode(enabled: bool, args) -> dict:
+    env = {**os.environ, "FAST_JSON_ENABLED": "true" if enabled else "false"}
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child",
+         "--requests", str(args.requests), "--chats", str(args.chats)],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    line = next(line for line in output.splitlines() if line.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fast JSON response path")
+    parser.add_argument("--requests", type=int, default=2000, help="Serializations and /api/auth/me calls per mode")
+    parser.add_argument("--chats", type=int, default=300, help="/api/chat turns per mode")
+    parser.add_argument("--rounds", type=int, default=3, help="Alternating runs of each mode")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    from bench_chat_concurrency import start_stub
+
+    def best(results):
+        return {name: min(result[name] for result in results) for name in results[0]}
+
+    stub = start_stub(STUB_PORT, 0)
+    try:
+        runs = {False: [], True: []}
+        for _ in range(args.rounds):
+            for enabled in (False, True):
+                runs[enabled].append(run_mode(enabled, args))
+        default, fast = best(runs[False]), best(runs[True])
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    print(f"CPU time per request (µs), best of {args.rounds}, {args.requests} requests, {args.chats} chats\n")
+    print(f"{'':>24} {'default':>9} {'fast':>9} {'saved':>9} {'saved %':>8}")
+    for name in default:
+        saved = default[name] - fast[name]
+        print(f"{name:>24} {default[name]:>9.1f} {fast[name]:>9.1f} {saved:>9.1f} {saved / default[name] * 100:>7.1f}%")
+
+
+if __name__ == "__main__":
+    main()
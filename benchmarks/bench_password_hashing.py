@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for password verification throughput.
+
+Verifies a bcrypt hash through the auth worker pool with a burst of
+concurrent logins, and reports logins/sec, logins/sec per core and the
+worst event loop stall observed while the burst was running.
+
+Usage:
+    python benchmarks/bench_password_hashing.py --rounds 10 12 --logins 64
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Return the largest delay seen between event loop ticks"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run_burst(auth, hashed: str, logins: int):
+    """Verify `logins` passwords concurrently, return (elapsed, worst loop lag)"""
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        auth.verify_and_update_password("correct horse", hashed) for _ in range(logins)
+    ))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    worst_lag = await lag_task
+    assert all(valid for valid, _ in results)
+    return elapsed, worst_lag
+
+
+async def main_async(args):
+    from backend import auth
+
+    cores = min(auth.PASSWORD_HASH_WORKERS, os.cpu_count() or 1)
+    print(f"Workers: {auth.PASSWORD_HASH_WORKERS}, cores used: {cores}, logins per burst: {args.logins}\n")
+    print(f"{'rounds':>6} {'logins/s':>10} {'per core':>10} {'max loop lag':>13}")
+
+    for rounds in args.rounds:
+        auth.pwd_context.update(bcrypt__default_rounds=rounds, bcrypt__min_rounds=rounds)
+        hashed = auth.pwd_context.hash("correct horse")
+
+        elapsed, worst_lag = await run_burst(auth, hashed, args.logins)
+        throughput = args.logins / elapsed
+        print(f"{rounds:>6} {throughput:>10.1f} {throughput / cores:>10.1f} {worst_lag * 1000:>10.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark password verification")
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 12])
+    parser.add_argument("--logins", type=int, default=32)
+    args = parser.parse_args()
+
+    # Let the whole burst queue up; the limit is exercised separately in production
+    os.environ.setdefault("PASSWORD_HASH_QUEUE_LIMIT", str(args.logins))
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
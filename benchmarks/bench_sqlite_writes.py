@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent chat writes on SQLite, before and after tuning.
+
+Each writer repeatedly does what a chat turn does to the database: read the
+recent history, insert the user and assistant messages and commit. It runs
+against two async engines on fresh database files:
+
+    before  aiosqlite defaults: a new connection per checkout, rollback
+            journal, synchronous=FULL
+    after   backend.database settings: pooled connections, WAL,
+            synchronous=NORMAL, busy_timeout and mmap
+
+Usage:
+    python benchmarks/bench_sqlite_writes.py --writers 1 4 16 32 --turns 50
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+tmpdir = tempfile.mkdtemp(prefix="fortune_sqlite_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'app.db')}"
+
+from sqlalchemy import create_engine, event, select  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker  # noqa: E402
+from sqlalchemy.pool import AsyncAdaptedQueuePool  # noqa: E402
+
+from backend.database import Base, pool_options, set_sqlite_pragmas  # noqa: E402
+from backend.models import User, ChatSession, ChatMessage  # noqa: E402
+
+
+def make_engine(path: str, tuned: bool):
+    """Create the schema with one user and session per writer, return an async engine"""
+    sync = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=sync)
+    sync.dispose()
+
+    url = f"sqlite+aiosqlite:///{path}"
+    if not tuned:
+        return create_async_engine(url)
+    engine = create_async_engine(url, poolclass=AsyncAdaptedQueuePool, **pool_options(url))
+    event.listen(engine.sync_engine, "connect", set_sqlite_pragmas)
+    return engine
+
+
+async def seed(Session, writers: int):
+    async with Session() as db:
+        for i in range(writers):
+            user = User(username=f"bench{i}", email=f"bench{i}@example.com", hashed_password="x")
+            db.add(user)
+            await db.flush()
+            db.add(ChatSession(user_id=user.id, session_id=f"session-{i}"))
+        await db.commit()
+        return list(await db.scalars(select(ChatSession.id).order_by(ChatSession.id)))
+
+
+async def chat_writer(Session, session_pk: int, turns: int, latencies: list, errors: list):
+    for turn in range(turns):
+        start = time.perf_counter()
+        try:
+            async with Session() as db:
+                await db.execute(
+                    select(ChatMessage.role, ChatMessage.content)
+                    .filter(ChatMessage.session_id == session_pk)
+                    .order_by(ChatMessage.created_at.desc())
+                    .limit(20)
+                )
+                db.add(ChatMessage(session_id=session_pk, role="user", content=f"Question {turn}"))
+                db.add(ChatMessage(session_id=session_pk, role="assistant", content="The stars say yes. " * 20))
+                await db.commit()
+        except Exception as e:
+            errors.append(type(e).__name__)
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(tuned: bool, writers: int, turns: int) -> dict:
+    path = os.path.join(tmpdir, f"{'after' if tuned else 'before'}-{writers}.db")
+    engine = make_engine(path, tuned)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    session_pks = await seed(Session, writers)
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    await asyncio.gather(*(chat_writer(Session, pk, turns, latencies, errors) for pk in session_pks))
+    elapsed = time.perf_counter() - start
+    await engine.dispose()
+
+    latencies.sort()
+    return {
+        "turns_per_sec": (len(latencies) - len(errors)) / elapsed,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": len(errors),
+    }
+
+
+async def main_async(args):
+    print(f"{args.turns} chat turns per writer, databases in {tmpdir}\n")
+    print(f"{'writers':>8} {'before t/s':>11} {'p95 ms':>8} {'err':>5} {'after t/s':>11} {'p95 ms':>8} {'err':>5} {'speedup':>8}")
+    for writers in args.writers:
+        before = await run(False, writers, args.turns)
+        after = await run(True, writers, args.turns)
+        print(f"{writers:>8} {before['turns_per_sec']:>11.1f} {before['p95_ms']:>8.1f} {before['errors']:>5} "
+              f"{after['turns_per_sec']:>11.1f} {after['p95_ms']:>8.1f} {after['errors']:>5} "
+              f"{after['turns_per_sec'] / before['turns_per_sec']:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent chat writes on SQLite")
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 4, 16, 32])
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
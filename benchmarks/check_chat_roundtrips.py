@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Check the database round trips of a chat turn.
+
+Drives /api/chat in-process against the stub completion server and counts
+the statements, connection pre-pings and commits the async engine sees per
+turn (with the auth cache warm). It also checks that no pooled connection is held while the
+upstream call is in progress. Exits non-zero if a turn does more work than
+expected, so it can run in CI.
+
+Usage:
+    python benchmarks/check_chat_roundtrips.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+import httpx
+from sqlalchemy import event
+
+from bench_chat_concurrency import start_stub
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STUB_PORT = 8901
+STUB_LATENCY = 0.5
+
+# (statements, commits) per turn
+EXPECTED = {
+    # INSERT session, one batched INSERT for both messages; one commit
+    "first turn": (2, 1),
+    # SELECT session + summary, SELECT history; INSERT both messages;
+    # the read transaction is ended before the upstream call
+    "follow-up turn": (3, 2),
+}
+
+
+class RoundTripCounter:
+    def __init__(self, sync_engine):
+        self.statements = []
+        self.commits = 0
+        event.listen(sync_engine, "before_cursor_execute", self._statement)
+        event.listen(sync_engine, "commit", self._commit)
+
+        # Pre-pings go straight to the driver, bypassing the cursor events
+        dialect = sync_engine.dialect
+        do_ping = dialect.do_ping
+
+        def counted_ping(dbapi_connection):
+            self.statements.append("(pool pre-ping)")
+            return do_ping(dbapi_connection)
+
+        dialect.do_ping = counted_ping
+
+    def _statement(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(" ".join(statement.split())[:90])
+
+    def _commit(self, conn):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = []
+        self.commits = 0
+
+
+async def main_async() -> bool:
+    from backend.database import engine, async_engine, SessionLocal, Base
+    from backend.models import User
+    from backend.auth import create_access_token
+    from backend.server import app
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(username="roundtrip", email="roundtrip@example.com", hashed_password="x", is_verified=True))
+    db.commit()
+    db.close()
+
+    counter = RoundTripCounter(async_engine.sync_engine)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'roundtrip'})}"}
+    ok = True
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=30) as client:
+        # Warm the auth cache so only the chat path is counted
+        (await client.get("/api/auth/me", headers=headers)).raise_for_status()
+
+        session_id = None
+        for name, (max_statements, max_commits) in EXPECTED.items():
+            counter.reset()
+            payload = {"message": "What does today hold?", "noCache": True}
+            if session_id:
+                payload["sessionId"] = session_id
+
+            request = asyncio.ensure_future(client.post("/api/chat", json=payload, headers=headers))
+            await asyncio.sleep(STUB_LATENCY / 2)
+            held = async_engine.pool.checkedout()
+            response = await request
+            response.raise_for_status()
+            session_id = response.json()["sessionId"]
+
+            statements, commits = len(counter.statements), counter.commits
+            passed = statements <= max_statements and commits <= max_commits and held == 0
+            ok = ok and passed
+            print(f"{'PASS' if passed else 'FAIL'} {name}: {statements} statements (max {max_statements}), "
+                  f"{commits} commits (max {max_commits}), {held} connections held during upstream call")
+            for statement in counter.statements:
+                print(f"       {statement}")
+    return ok
+
+
+def main():
+    tmpdir = tempfile.mkdtemp(prefix="fortune_roundtrips_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'check.db')}"
+    os.environ["OPENAI_API_KEY"] = "stub-key"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{STUB_PORT}/v1"
+    os.environ["METRICS_ENABLED"] = "false"
+
+    stub = start_stub(STUB_PORT, STUB_LATENCY)
+    try:
+        ok = asyncio.run(main_async())
+    finally:
+        stub.terminate()
+        stub.wait()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
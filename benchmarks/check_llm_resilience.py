@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Check how chat behaves when the upstream LLM is slow or failing.
+
+Drives /api/chat and /api/chat/stream in-process against the stub completion
+server, injecting faults through its /faults endpoint, with short timeouts
+and a small circuit breaker so the whole run takes a few seconds:
+
+    - a couple of failed attempts are retried and the chat succeeds
+    - a hung upstream gives a 504 once the deadline passes, not a long stall
+    - an outage opens the circuit; chats then fail fast with 503 and
+      /api/health reports it
+    - after the cooldown a failed probe reopens the circuit and a successful
+      one closes it
+
+Exits non-zero if any step misbehaves, so it can run in CI.
+
+Usage:
+    python benchmarks/check_llm_resilience.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+import httpx
+
+from bench_chat_concurrency import start_stub
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STUB_PORT = 8903
+STUB_LATENCY = 0.05
+
+SETTINGS = {
+    "LLM_ATTEMPT_TIMEOUT": "0.5",
+    "LLM_DEADLINE": "3",
+    "LLM_MAX_RETRIES": "2",
+    "LLM_RETRY_BASE_DELAY": "0.05",
+    "LLM_RETRY_MAX_DELAY": "0.2",
+    "LLM_BREAKER_WINDOW": "60",
+    "LLM_BREAKER_MIN_CALLS": "10",
+    "LLM_BREAKER_ERROR_RATE": "0.5",
+    "LLM_BREAKER_COOLDOWN": "1",
+}
+
+# Fail-fast responses must not wait on the upstream at all
+FAST = 0.1
+
+
+async def main_async() -> bool:
+    from backend.database import engine, SessionLocal, Base
+    from backend.models import User
+    from backend.auth import create_access_token
+    from backend.server import app
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(username="resilience", email="resilience@example.com", hashed_password="x", is_verified=True))
+    db.commit()
+    db.close()
+
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': 'resilience'})}"}
+    stub = httpx.AsyncClient(base_url=f"http://127.0.0.1:{STUB_PORT}")
+    results = []
+
+    async def faults(**changes):
+        (await stub.post("/faults", json=changes)).raise_for_status()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=30) as client:
+
+        async def chat(stream: bool = False):
+            start = time.perf_counter()
+            path = "/api/chat/stream" if stream else "/api/chat"
+            # A new session each time, so no background summaries call the upstream
+            response = await client.post(path, json={"message": "What does today hold?", "noCache": True},
+                                         headers=headers)
+            return response, time.perf_counter() - start
+
+        async def circuit():
+            return (await client.get("/api/health")).json()["llmCircuit"]
+
+        def check(name: str, passed: bool, detail: str):
+            results.append(passed)
+            print(f"{'PASS' if passed else 'FAIL'} {name}: {detail}")
+
+        # Enough good calls that the retried and hung steps stay under the error rate:
+        # 6 of 11 attempts succeed before the outage, whose first failure opens the circuit
+        for _ in range(5):
+            response, elapsed = await chat()
+        check("healthy", response.status_code == 200, f"{response.status_code} in {elapsed:.2f}s")
+
+        await faults(error_next=2, error_status=500)
+        response, elapsed = await chat()
+        stats = (await client.get("/api/stats")).json()["llm"]
+        check("retried", response.status_code == 200 and stats["retries"] == 2,
+              f"{response.status_code} after {stats['retries']} retries in {elapsed:.2f}s")
+
+        await faults(hang_rate=1.0, hang=30)
+        response, elapsed = await chat()
+        check("hung upstream", response.status_code == 504 and elapsed < 3.5,
+              f"{response.status_code} in {elapsed:.2f}s")
+
+        await faults(hang_rate=0.0, error_rate=1.0, error_status=503)
+        response, elapsed = await chat()
+        state = await circuit()
+        check("outage opens the circuit", response.status_code in (502, 503) and state == "open",
+              f"{response.status_code} in {elapsed:.2f}s, circuit {state}")
+
+        response, elapsed = await chat()
+        check("fail fast", response.status_code == 503 and elapsed < FAST and "retry-after" in response.headers,
+              f"{response.status_code} in {elapsed * 1000:.0f}ms, Retry-After {response.headers.get('retry-after')}")
+
+        response, elapsed = await chat(stream=True)
+        check("fail fast when streaming", response.status_code == 503 and elapsed < FAST,
+              f"{response.status_code} in {elapsed * 1000:.0f}ms")
+
+        await asyncio.sleep(float(SETTINGS["LLM_BREAKER_COOLDOWN"]))
+        response, elapsed = await chat()
+        state = await circuit()
+        check("failed probe reopens", response.status_code == 502 and state == "open",
+              f"{response.status_code} in {elapsed:.2f}s, circuit {state}")
+
+        await faults(error_rate=0.0)
+        await asyncio.sleep(float(SETTINGS["LLM_BREAKER_COOLDOWN"]))
+        response, elapsed = await chat()
+        state = await circuit()
+        check("recovered probe closes", response.status_code == 200 and state == "closed",
+              f"{response.status_code} in {elapsed:.2f}s, circuit {state}")
+
+        response, elapsed = await chat(stream=True)
+        check("streaming after recovery", response.status_code == 200 and "event: done" in response.text,
+              f"{response.status_code} in {elapsed:.2f}s")
+
+    await stub.aclose()
+    return all(results)
+
+
+def main():
+    tmpdir = tempfile.mkdtemp(prefix="fortune_resilience_")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmpdir, 'check.db')}"
+    os.environ["OPENAI_API_KEY"] = "stub-key"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{STUB_PORT}/v1"
+    os.environ["METRICS_ENABLED"] = "false"
+    os.environ["CHAT_USER_RATE_PER_MINUTE"] = "0"
+    os.environ.update(SETTINGS)
+
+    stub = start_stub(STUB_PORT, STUB_LATENCY)
+    try:
+        ok = asyncio.run(main_async())
+    finally:
+        stub.terminate()
+        stub.wait()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+Load test the full server with local LLM and SMTP stubs.
+
+Starts benchmarks/stub_llm_server.py with a fixed latency, an in-process SMTP
+sink and `uvicorn backend.server:app` on a fresh SQLite database, then drives
+a seeded mix of user scenarios at fixed concurrency:
+
+    newcomer   register, chat a few times, clear history
+    returning  log in, chat a few times
+    browser    read a daily fortune and the health check
+
+Latency percentiles and throughput are reported per endpoint and written as
+JSON, tagged with the current git commit. Pass an earlier results file with
+--baseline to print the change in p95 latency and throughput against it.
+
+Usage:
+    python benchmarks/loadtest.py --concurrency 16 --iterations 10 --output results.json
+    python benchmarks/loadtest.py --baseline results.json --env BCRYPT_ROUNDS=10
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+from bench_chat_concurrency import start_stub
+from stub_smtp_server import start_sink
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SIGNS = ["aries", "taurus", "gemini", "cancer", "leo", "virgo", "libra",
+         "scorpio", "sagittarius", "capricorn", "aquarius", "pisces"]
+QUESTIONS = [
+    "What does today hold for me?",
+    "Will my career change this year?",
+    "Tell me about love in the coming weeks.",
+    "Should I take the new opportunity?",
+]
+PASSWORD = "loadtest-password"
+
+
+class Recorder:
+    """Collects latency samples and errors per endpoint"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client: httpx.AsyncClient, endpoint: str, method: str, url: str, **kwargs):
+        """Send one request, timing it under `endpoint` (method and route template)"""
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            await response.aread()
+        except httpx.HTTPError as e:
+            self.samples[endpoint].append(time.perf_counter() - start)
+            self.errors[endpoint] += 1
+            self.statuses[endpoint][type(e).__name__] += 1
+            return None
+        self.samples[endpoint].append(time.perf_counter() - start)
+        self.statuses[endpoint][str(response.status_code)] += 1
+        if response.status_code >= 400:
+            self.errors[endpoint] += 1
+            return None
+        return response
+
+
+def percentile(sorted_values, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    """Per-endpoint count, error count, throughput and latency percentiles (ms)"""
+    endpoints = {}
+    for endpoint in sorted(recorder.samples):
+        values = sorted(recorder.samples[endpoint])
+        endpoints[endpoint] = {
+            "count": len(values),
+            "errors": recorder.errors[endpoint],
+            "statuses": dict(recorder.statuses[endpoint]),
+            "throughput_rps": round(len(values) / elapsed, 3),
+            "mean_ms": round(sum(values) / len(values) * 1000, 2),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(values[-1] * 1000, 2),
+        }
+    return endpoints
+
+
+# ===== SCENARIOS =====
+
+async def chat_turns(client, recorder, token: str, rng: random.Random, args):
+    """Send a few chat messages in one session, return the session id"""
+    headers = {"Authorization": f"Bearer {token}"}
+    endpoint, url = ("POST /api/chat/stream", "/api/chat/stream") if args.stream else ("POST /api/chat", "/api/chat")
+    session_id = None
+    for _ in range(args.chats):
+        payload = {"message": rng.choice(QUESTIONS), "zodiacSign": rng.choice(SIGNS)}
+        if session_id:
+            payload["sessionId"] = session_id
+        response = await recorder.request(client, endpoint, "POST", url, json=payload, headers=headers)
+        if response is None:
+            break
+        if args.stream:
+            session_id = parse_stream_session(response.text) or session_id
+        else:
+            session_id = response.json()["sessionId"]
+    return session_id
+
+
+def parse_stream_session(body: str):
+    """Pull the sessionId out of the final `done` event of an SSE reply"""
+    for block in body.split("\n\n"):
+        if block.startswith("event: done"):
+            for line in block.splitlines():
+                if line.startswith("data: "):
+                    return json.loads(line[6:]).get("sessionId")
+    return None
+
+
+async def newcomer(client, recorder, user: str, rng, args, state):
+    response = await recorder.request(client, "POST /api/auth/register", "POST", "/api/auth/register", json={
+        "username": user, "email": f"{user}@example.com", "password": PASSWORD,
+    })
+    if response is None:
+        return
+    state["registered"] += 1
+    token = response.json()["access_token"]
+    session_id = await chat_turns(client, recorder, token, rng, args)
+    if session_id:
+        await recorder.request(client, "POST /api/clear-history", "POST", "/api/clear-history",
+                               json={"sessionId": session_id},
+                               headers={"Authorization": f"Bearer {token}"})
+
+
+async def returning(client, recorder, user: str, rng, args, state):
+    account = rng.choice(state["accounts"])
+    response = await recorder.request(client, "POST /api/auth/login", "POST", "/api/auth/login", json={
+        "username": account, "password": PASSWORD,
+    })
+    if response is None:
+        return
+    await chat_turns(client, recorder, response.json()["access_token"], rng, args)
+
+
+async def browser(client, recorder, user: str, rng, args, state):
+    await recorder.request(client, "GET /api/fortune/{sign}", "GET", f"/api/fortune/{rng.choice(SIGNS)}")
+    await recorder.request(client, "GET /api/health", "GET", "/api/health")
+
+
+SCENARIOS = {"newcomer": newcomer, "returning": returning, "browser": browser}
+
+
+def parse_mix(value: str) -> dict:
+    """Parse `newcomer=2,returning=5,browser=3` into scenario weights"""
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+async def run_load(args, recorder: Recorder, state: dict, base_url: str) -> float:
+    """Run every virtual user to completion, return the wall time in seconds"""
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+        # Accounts for the returning scenario are created before the clock starts
+        setup = Recorder()
+        for i in range(args.accounts):
+            username = f"{state['run_id']}r{i}"
+            response = await setup.request(client, "setup", "POST", "/api/auth/register", json={
+                "username": username, "email": f"{username}@example.com", "password": PASSWORD,
+            })
+            if response is None:
+                raise RuntimeError(f"Could not create account {username}: {dict(setup.statuses['setup'])}")
+            state["accounts"].append(username)
+            state["registered"] += 1
+
+        names = list(args.mix)
+        weights = [args.mix[name] for name in names]
+
+        async def virtual_user(index: int):
+            rng = random.Random(args.seed * 100003 + index)
+            for iteration in range(args.iterations):
+                scenario = rng.choices(names, weights)[0]
+                user = f"{state['run_id']}u{index}i{iteration}"
+                await SCENARIOS[scenario](client, recorder, user, rng, args, state)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(virtual_user(i) for i in range(args.concurrency)))
+        return time.perf_counter() - start
+
+
+# ===== PROCESS MANAGEMENT =====
+
+def start_server(args, env: dict, log_path: str) -> subprocess.Popen:
+    """Create the schema, start uvicorn and wait for the health check"""
+    subprocess.run([sys.executable, "-m", "backend.init_db"], cwd=ROOT, env=env, check=True,
+                   stdout=subprocess.DEVNULL)
+    log = open(log_path, "w")
+    proc = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "backend.server:app",
+        "--host", "127.0.0.1", "--port", str(args.port), "--log-level", "warning",
+    ], cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"Server exited early, see {log_path}")
+        try:
+            httpx.get(f"http://127.0.0.1:{args.port}/api/health", timeout=0.5)
+            return proc
+        except httpx.TransportError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"Server did not start, see {log_path}")
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_report(results: dict, baseline: dict = None):
+    """Print the per-endpoint table, with deltas when a baseline is given"""
+    print(f"\n{'endpoint':<28} {'count':>6} {'err':>4} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for endpoint, stats in results["endpoints"].items():
+        line = (f"{endpoint:<28} {stats['count']:>6} {stats['errors']:>4} {stats['throughput_rps']:>8.2f} "
+                f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+        old = (baseline or {}).get("endpoints", {}).get(endpoint)
+        if old:
+            line += (f"   p95 {change(old['p95_ms'], stats['p95_ms'])}"
+                     f"  req/s {change(old['throughput_rps'], stats['throughput_rps'])}")
+        print(line)
+    print(f"\nEmails: {results['emails']['delivered']} of {results['emails']['queued']} delivered to the sink")
+    if baseline:
+        print(f"Compared with {baseline.get('commit', 'unknown')} ({baseline.get('timestamp', '')})")
+
+
+def change(old: float, new: float) -> str:
+    if not old:
+        return "   n/a"
+    return f"{(new - old) / old:+6.1%}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Fortune Teller server")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent virtual users")
+    parser.add_argument("--iterations", type=int, default=10, help="Scenarios run by each virtual user")
+    parser.add_argument("--chats", type=int, default=3, help="Chat messages per chatting scenario")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("newcomer=2,returning=5,browser=3"))
+    parser.add_argument("--accounts", type=int, default=8, help="Accounts created up front for returning users")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub LLM seconds per completion")
+    parser.add_argument("--stream", action="store_true", help="Chat through /api/chat/stream")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--llm-port", type=int, default=8900)
+    parser.add_argument("--smtp-port", type=int, default=8025)
+    parser.add_argument("--database-url", help="Use this database instead of a fresh SQLite file")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE",
+                        help="Extra environment for the server, e.g. BCRYPT_ROUNDS=10")
+    parser.add_argument("--output", default="loadtest-results.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="fortune_loadtest_")
+    env = dict(os.environ)
+    env.pop("ASYNC_DATABASE_URL", None)
+    env.update({
+        "DATABASE_URL": args.database_url or f"sqlite:///{os.path.join(tmpdir, 'loadtest.db')}",
+        "OPENAI_API_KEY": "stub-key",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.llm_port}/v1",
+        "SMTP_HOST": "127.0.0.1",
+        "SMTP_PORT": str(args.smtp_port),
+        "SMTP_USE_TLS": "false",
+        "SMTP_USE_AUTH": "false",
+        "FROM_EMAIL": "fortune@example.com",
+        "EMAIL_OUTBOX_POLL_INTERVAL": "1",
+        # Returning users share a few accounts, so per-user rate limits would skew results
+        "CHAT_USER_RATE_PER_MINUTE": "0",
+        "PYTHONUNBUFFERED": "1",
+    })
+    for item in args.env:
+        key, _, value = item.partition("=")
+        env[key] = value
+
+    recorder = Recorder()
+    state = {"run_id": f"lt{int(time.time()) % 100000}", "accounts": [], "registered": 0}
+    log_path = os.path.join(tmpdir, "server.log")
+
+    stub = start_stub(args.llm_port, args.latency)
+    controller, sink = start_sink(args.smtp_port)
+    server = None
+    try:
+        server = start_server(args, env, log_path)
+        print(f"Server log: {log_path}")
+        print(f"{args.concurrency} users x {args.iterations} scenarios, stub latency {args.latency:.3f}s")
+        elapsed = asyncio.run(run_load(args, recorder, state, f"http://127.0.0.1:{args.port}"))
+
+        # Give the outbox sender a moment to drain before counting emails
+        deadline = time.time() + 15
+        while sink.messages < state["registered"] and time.time() < deadline:
+            time.sleep(0.5)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        controller.stop()
+        stub.terminate()
+        stub.wait()
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "config": {
+            "concurrency": args.concurrency, "iterations": args.iterations, "chats": args.chats,
+            "mix": args.mix, "accounts": args.accounts, "latency": args.latency,
+            "stream": args.stream, "seed": args.seed, "env": args.env,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "endpoints": summarize(recorder, elapsed),
+        "emails": {"queued": state["registered"], "delivered": sink.messages},
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_report(results, baseline)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
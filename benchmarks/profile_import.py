@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Import-time profile of the backend.
+
+Starts fresh interpreters that import the app (as a uvicorn worker does)
+and run its startup hook, then reports:
+
+    - median wall time of the import and of startup
+    - the slowest modules by cumulative import time (python -X importtime)
+    - self import time summed per top-level package
+    - which heavy optional dependencies were imported eagerly
+
+Run it before and after a change to see its effect on worker start and
+autoscaling cold starts.
+
+Usage:
+    python benchmarks/profile_import.py --runs 5 --top 20
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that should only load once the feature using them runs
+DEFERRED_MODULES = ("openai", "httpx", "smtplib", "email.mime.multipart", "aiosqlite", "aiomysql")
+
+CHILD = """
+import asyncio, json, sys, time
+start = time.perf_counter()
+module = __import__({module!r}, fromlist=["app"])
+imported = time.perf_counter()
+loaded = [name for name in {deferred!r} if name in sys.modules]
+if {startup!r}:
+    async def cycle():
+        await module.startup()
+        ready = time.perf_counter()
+        await module.shutdown()
+        return ready
+    ready = asyncio.run(cycle())
+else:
+    ready = imported
+print("RESULT " + json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "loaded": loaded,
+}}))
+"""
+
+
+def run_once(module: str, startup: bool, env: dict):
+    """Import the module in a fresh interpreter, return (timings, importtime lines)"""
+    code = CHILD.format(module=module, deferred=DEFERRED_MODULES, startup=startup)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    line = next(line for line in proc.stdout.splitlines() if line.startswith("RESULT "))
+    return json.loads(line[len("RESULT "):]), proc.stderr.splitlines()
+
+
+def parse_importtime(lines):
+    """Yield (module, self_us, cumulative_us) from -X importtime output"""
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        yield name.strip(), int(self_us), int(cumulative_us)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the backend's import and startup time")
+    parser.add_argument("--module", default="backend.server")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--no-startup", action="store_true", help="Only import, don't run the startup hook")
+    args = parser.parse_args()
+
+    tmpdir = tempfile.mkdtemp(prefix="fortune_import_")
+    env = {
+        **os.environ,
+        "PYTHONPATH": ROOT,
+        "DATABASE_URL": os.environ.get("DATABASE_URL", f"sqlite:///{os.path.join(tmpdir, 'profile.db')}"),
+        # Background workers would otherwise start during the startup hook
+        "OUTBOX_ENABLED": "false",
+        "TOKEN_SWEEP_ENABLED": "false",
+        "ARCHIVE_ENABLED": "false",
+    }
+
+    # The first run warms the filesystem and bytecode caches
+    run_once(args.module, not args.no_startup, env)
+    runs = [run_once(args.module, not args.no_startup, env) for _ in range(args.runs)]
+    timings = [timing for timing, _ in runs]
+
+    print(f"{args.module}, median of {args.runs} runs\n")
+    print(f"  import   {statistics.median(t['import_ms'] for t in timings):>8.1f} ms")
+    if not args.no_startup:
+        print(f"  startup  {statistics.median(t['startup_ms'] for t in timings):>8.1f} ms")
+
+    # Per-module numbers from the median run by import time
+    _, lines = sorted(runs, key=lambda run: run[0]["import_ms"])[len(runs) // 2]
+    modules = list(parse_importtime(lines))
+
+    print(f"\nSlowest modules (cumulative ms)")
+    for name, _, cumulative_us in sorted(modules, key=lambda m: m[2], reverse=True)[:args.top]:
+        print(f"  {cumulative_us / 1000:>8.1f}  {name}")
+
+    packages = defaultdict(int)
+    for name, self_us, _ in modules:
+        packages[name.split(".")[0]] += self_us
+    print(f"\nSelf time by package (ms)")
+    for package, self_us in sorted(packages.items(), key=lambda p: p[1], reverse=True)[:args.top]:
+        print(f"  {self_us / 1000:>8.1f}  {package}")
+
+    loaded = timings[0]["loaded"]
+    print(f"\nDeferred modules imported eagerly: {', '.join(loaded) if loaded else 'none'}")
+
+
+if __name__ == "__main__":
+    main()
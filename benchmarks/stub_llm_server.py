@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Local stub of the OpenAI chat completions API for benchmarking.
+
+Every request sleeps for a configurable latency and then returns a canned
+fortune, so benchmarks measure our server rather than the real upstream.
+Streaming requests (`"stream": true`) spread the latency across the tokens.
+
+Faults can be injected to exercise the client's timeouts, retries and circuit
+breaker: a share of requests fail with an HTTP error status, a share hang
+before answering, and error_next fails exactly the next N requests. Change
+them while the stub runs with POST /faults, e.g.
+{"error_rate": 1.0, "error_status": 503}, and read them with GET /faults.
+
+Usage:
+    python benchmarks/stub_llm_server.py --port 8900 --latency 0.5
+    python benchmarks/stub_llm_server.py --error-rate 0.3 --error-status 500 --hang-rate 0.1 --hang 30
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+
+import json
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+STUB_REPLY = (
+    "The stars reveal a season of quiet transformation. "
+    "I sense the Wheel of Fortune turning in your favor, "
+    "and the cosmic currents show new doors opening before you."
+)
+
+app = FastAPI(title="Stub LLM Server")
+app.state.latency = 0.5
+app.state.faults = {
+    "error_rate": 0.0,  # share of requests answered with error_status
+    "error_status": 500,
+    "error_next": 0,  # the next N requests fail, whatever error_rate says
+    "hang_rate": 0.0,  # share of requests that wait `hang` seconds before answering
+    "hang": 3600.0,
+}
+
+
+@app.get("/faults")
+async def get_faults():
+    return app.state.faults
+
+
+@app.post("/faults")
+async def set_faults(request: Request):
+    """Change the injected faults; omitted keys keep their values"""
+    changes = await request.json()
+    unknown = set(changes) - set(app.state.faults)
+    if unknown:
+        return JSONResponse({"detail": f"Unknown faults: {', '.join(sorted(unknown))}"}, status_code=400)
+    app.state.faults.update(changes)
+    return app.state.faults
+
+
+async def inject_fault():
+    """Hang and/or return an error response, as configured"""
+    faults = app.state.faults
+    if random.random() < faults["hang_rate"]:
+        await asyncio.sleep(faults["hang"])
+    fail = faults["error_next"] > 0 or random.random() < faults["error_rate"]
+    if faults["error_next"] > 0:
+        faults["error_next"] -= 1
+    if fail:
+        status = int(faults["error_status"])
+        headers = {"Retry-After": "1"} if status == 429 else None
+        return JSONResponse(
+            {"error": {"message": f"Injected fault ({status})", "type": "server_error", "code": None}},
+            status_code=status,
+            headers=headers,
+        )
+    return None
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    """Return a canned completion after the configured latency"""
+    body = await request.json()
+    completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+    fault = await inject_fault()
+    if fault is not None:
+        return fault
+
+    if body.get("stream"):
+        return StreamingResponse(
+            stream_reply(completion_id, body.get("model", "stub")),
+            media_type="text/event-stream",
+        )
+
+    await asyncio.sleep(app.state.latency)
+
+    return {
+        "id": completion_id,
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": STUB_REPLY},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+async def stream_reply(completion_id: str, model: str):
+    """Yield the canned reply word by word in OpenAI's streaming format"""
+    words = STUB_REPLY.split(" ")
+    delay = app.state.latency / len(words)
+
+    for i, word in enumerate(words):
+        await asyncio.sleep(delay)
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "delta": {"content": word if i == 0 else " " + word},
+                "finish_reason": None,
+            }],
+        }
+        yield f"data: {json.dumps(chunk)}\n\n"
+
+    yield "data: [DONE]\n\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per completion")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of failed requests")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Share of requests that hang")
+    parser.add_argument("--hang", type=float, default=3600.0, help="Seconds a hanging request waits")
+    args = parser.parse_args()
+
+    app.state.latency = args.latency
+    app.state.faults.update(
+        error_rate=args.error_rate, error_status=args.error_status,
+        hang_rate=args.hang_rate, hang=args.hang,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Local SMTP sink for benchmarking.
+
+Accepts every message, counts it and throws it away, so email delivery can
+be exercised without a real mail server. Point the backend at it with
+SMTP_HOST=127.0.0.1, SMTP_PORT=<port>, SMTP_USE_TLS=false and SMTP_USE_AUTH=false.
+
+Requires aiosmtpd (`pip install aiosmtpd`).
+
+Usage:
+    python benchmarks/stub_smtp_server.py --port 8025
+"""
+
+import argparse
+import threading
+import time
+
+
+class CountingHandler:
+    """aiosmtpd handler that counts delivered messages"""
+
+    def __init__(self):
+        self.messages = 0
+        self.recipients = 0
+        self._lock = threading.Lock()
+
+    async def handle_DATA(self, server, session, envelope):
+        with self._lock:
+            self.messages += 1
+            self.recipients += len(envelope.rcpt_tos)
+        return "250 Message accepted for delivery"
+
+
+def start_sink(port: int, host: str = "127.0.0.1"):
+    """Start the sink in a background thread, return (controller, handler)"""
+    try:
+        from aiosmtpd.controller import Controller
+    except ImportError:
+        raise RuntimeError("The SMTP sink needs aiosmtpd: pip install aiosmtpd")
+
+    handler = CountingHandler()
+    controller = Controller(handler, hostname=host, port=port)
+    controller.start()
+    return controller, handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args()
+
+    controller, handler = start_sink(args.port, args.host)
+    print(f"SMTP sink listening on {args.host}:{args.port}")
+    try:
+        while True:
+            time.sleep(10)
+            print(f"{handler.messages} messages received")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
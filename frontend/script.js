@@ -7,24 +7,22 @@ let authToken = null;
 let chatSessionId = null;
 let currentZodiacSign = null;
 
-// Zodiac data with fortunes
+// Zodiac signs (daily fortunes are computed by the server)
 const zodiacData = {
-    aries: { name: "Aries", icon: "♈", element: "Fire", fortunes: ["Today's fiery energy brings new opportunities. Your courage will lead you to unexpected success.", "The stars align in your favor today. Take bold action and trust your instincts.", "Your natural leadership shines through. Others look to you for guidance and inspiration.", "A challenge presents itself, but your determination will see you through victoriously.", "Creative energy flows strongly. Express yourself boldly and authentically."], colors: ["Red", "Scarlet", "Crimson", "Orange"], compatibleSigns: ["Leo", "Sagittarius", "Gemini", "Aquarius"] },
-    taurus: { name: "Taurus", icon: "♉", element: "Earth", fortunes: ["Patience and persistence pay off today. Your steady approach brings tangible rewards.", "Financial opportunities emerge. Trust your practical instincts about investments.", "Comfort and security are within reach. Focus on building lasting foundations.", "Your reliability makes you invaluable to others. Your help will be deeply appreciated.", "Indulge in life's pleasures today. You've earned a moment of luxury and relaxation."], colors: ["Green", "Pink", "Emerald", "Turquoise"], compatibleSigns: ["Virgo", "Capricorn", "Cancer", "Pisces"] },
-    gemini: { name: "Gemini", icon: "♊", element: "Air", fortunes: ["Communication is your superpower today. Your words inspire and enlighten others.", "Curiosity leads to fascinating discoveries. Follow your interests wherever they take you.", "Social connections bring joy and opportunity. Network and share your brilliant ideas.", "Adaptability is your strength. Embrace change and flow with new circumstances.", "Your quick wit and charm open doors. Express yourself with confidence."], colors: ["Yellow", "Light Blue", "Silver", "White"], compatibleSigns: ["Libra", "Aquarius", "Aries", "Leo"] },
-    cancer: { name: "Cancer", icon: "♋", element: "Water", fortunes: ["Trust your intuition today. Your emotional intelligence guides you to the right path.", "Home and family bring comfort and joy. Nurture your closest relationships.", "Your caring nature is deeply appreciated. Someone needs your compassionate support.", "Creative imagination flows freely. Express your feelings through artistic pursuits.", "Protect your energy while staying open to love. Balance is key to your wellbeing."], colors: ["Silver", "White", "Pearl", "Light Blue"], compatibleSigns: ["Scorpio", "Pisces", "Taurus", "Virgo"] },
-    leo: { name: "Leo", icon: "♌", element: "Fire", fortunes: ["Your natural charisma is magnetic today. Step into the spotlight with confidence.", "Generosity of spirit brings unexpected blessings. Share your warmth with others.", "Creative projects flourish under your passionate guidance. Express your unique talents.", "Leadership opportunities arise. Your courage inspires others to follow your vision.", "Joy and celebration are in the air. Let your playful side shine through."], colors: ["Gold", "Orange", "Yellow", "Royal Purple"], compatibleSigns: ["Aries", "Sagittarius", "Gemini", "Libra"] },
-    virgo: { name: "Virgo", icon: "♍", element: "Earth", fortunes: ["Your attention to detail solves complex problems. Your analytical skills are unmatched.", "Organization brings clarity and peace. Take time to create order in your environment.", "Service to others fulfills your soul. Your helpful nature makes a real difference.", "Health and wellness take priority. Your body appreciates your mindful care.", "Practical wisdom guides your decisions. Trust in your methodical approach."], colors: ["Navy Blue", "Grey", "Beige", "Forest Green"], compatibleSigns: ["Taurus", "Capricorn", "Cancer", "Scorpio"] },
-    libra: { name: "Libra", icon: "♎", element: "Air", fortunes: ["Balance and harmony are within reach. Your diplomatic skills bring peace to conflicts.", "Beauty surrounds you today. Appreciate art, nature, and elegant solutions.", "Partnerships flourish under your fair and thoughtful guidance. Collaboration brings success.", "Your sense of justice guides important decisions. Stand up for what's right.", "Social grace opens doors. Your charm and tact create wonderful opportunities."], colors: ["Pink", "Light Blue", "Lavender", "Mint Green"], compatibleSigns: ["Gemini", "Aquarius", "Leo", "Sagittarius"] },
-    scorpio: { name: "Scorpio", icon: "♏", element: "Water", fortunes: ["Intense focus brings breakthrough insights. Your determination is unstoppable.", "Hidden truths come to light. Your intuition reveals what others cannot see.", "Transformation is in the air. Embrace change and emerge stronger than before.", "Passionate energy drives your pursuits. Channel your intensity into meaningful goals.", "Loyalty and depth in relationships bring profound connections. Trust those who earn it."], colors: ["Deep Red", "Black", "Burgundy", "Dark Purple"], compatibleSigns: ["Cancer", "Pisces", "Virgo", "Capricorn"] },
-    sagittarius: { name: "Sagittarius", icon: "♐", element: "Fire", fortunes: ["Adventure calls your name. Expand your horizons through travel or learning.", "Optimism attracts abundance. Your positive outlook creates wonderful opportunities.", "Truth and wisdom guide your path. Share your philosophical insights with others.", "Freedom and exploration fulfill your spirit. Break free from limiting routines.", "Your enthusiasm is contagious. Inspire others with your adventurous spirit."], colors: ["Purple", "Dark Blue", "Turquoise", "Red"], compatibleSigns: ["Aries", "Leo", "Libra", "Aquarius"] },
-    capricorn: { name: "Capricorn", icon: "♑", element: "Earth", fortunes: ["Ambition drives you forward. Your disciplined approach leads to lasting success.", "Responsibility brings rewards. Your dedication does not go unnoticed.", "Strategic planning pays dividends. Take time to map out your long-term goals.", "Professional opportunities arise. Your reputation for excellence opens doors.", "Patience and persistence are your allies. Success comes to those who endure."], colors: ["Dark Green", "Brown", "Grey", "Black"], compatibleSigns: ["Taurus", "Virgo", "Scorpio", "Pisces"] },
-    aquarius: { name: "Aquarius", icon: "♒", element: "Air", fortunes: ["Innovation and originality set you apart. Your unique perspective solves problems.", "Humanitarian efforts bring fulfillment. Make a difference in your community.", "Independent thinking leads to breakthroughs. Trust your unconventional ideas.", "Friendships and social networks flourish. Connect with like-minded visionaries.", "Future-focused vision guides your choices. You're ahead of your time."], colors: ["Electric Blue", "Silver", "Aqua", "Neon Green"], compatibleSigns: ["Gemini", "Libra", "Aries", "Sagittarius"] },
-    pisces: { name: "Pisces", icon: "♓", element: "Water", fortunes: ["Intuition and dreams guide your path. Trust the whispers of your soul.", "Compassion opens hearts. Your empathetic nature heals those around you.", "Artistic expression flows naturally. Create beauty through your unique vision.", "Spiritual insights bring peace. Connect with your higher self through meditation.", "Imagination knows no bounds. Your creative dreams can become reality."], colors: ["Sea Green", "Lavender", "Purple", "Aquamarine"], compatibleSigns: ["Cancer", "Scorpio", "Taurus", "Capricorn"] }
+    aries: { name: "Aries", icon: "♈" },
+    taurus: { name: "Taurus", icon: "♉" },
+    gemini: { name: "Gemini", icon: "♊" },
+    cancer: { name: "Cancer", icon: "♋" },
+    leo: { name: "Leo", icon: "♌" },
+    virgo: { name: "Virgo", icon: "♍" },
+    libra: { name: "Libra", icon: "♎" },
+    scorpio: { name: "Scorpio", icon: "♏" },
+    sagittarius: { name: "Sagittarius", icon: "♐" },
+    capricorn: { name: "Capricorn", icon: "♑" },
+    aquarius: { name: "Aquarius", icon: "♒" },
+    pisces: { name: "Pisces", icon: "♓" }
 };
 
-const adviceTemplates = ["Stay true to your authentic self and trust your inner wisdom.", "Take time for self-care and recharge your spiritual batteries.", "Be open to unexpected opportunities that come your way.", "Listen carefully to what others are really saying beneath their words.", "Balance your ambitions with moments of rest and reflection.", "Trust the process, even when the path isn't clear.", "Your kindness today will create ripples of positivity.", "Focus on what you can control and release what you cannot.", "Embrace change as a pathway to growth and transformation.", "Connect with nature to ground yourself and find clarity."];
-
 // ===== AUTHENTICATION =====
 
 function saveAuth(token, user) {
@@ -117,28 +115,16 @@ function getCurrentDate() {
     return new Date().toLocaleDateString('en-US', options);
 }
 
-function randomInRange(min, max) {
-    return Math.floor(Math.random() * (max - min + 1)) + min;
-}
-
-function generateLuckyNumbers() {
-    const numbers = new Set();
-    while (numbers.size < 5) {
-        numbers.add(randomInRange(1, 99));
+async function fetchFortune(sign) {
+    // Same reading for everyone today, so the browser/CDN may cache it until midnight
+    const response = await fetch(`${API_BASE_URL}/fortune/${sign}`);
+    if (!response.ok) {
+        throw new Error('Unable to read the stars right now. Please try again.');
     }
-    return Array.from(numbers).sort((a, b) => a - b);
+    return response.json();
 }
 
-function generateEnergyLevels() {
-    return {
-        love: randomInRange(60, 100),
-        career: randomInRange(60, 100),
-        health: randomInRange(60, 100),
-        finance: randomInRange(60, 100)
-    };
-}
-
-function displayFortune(sign) {
+async function displayFortune(sign) {
     const data = zodiacData[sign];
     const zodiacSelection = document.getElementById('zodiacSelection');
     const fortuneDisplay = document.getElementById('fortuneDisplay');
@@ -150,10 +136,17 @@ function displayFortune(sign) {
     document.getElementById('fortuneTitle').textContent = data.name;
     document.getElementById('fortuneDate').textContent = getCurrentDate();
     
-    const randomFortune = data.fortunes[randomInRange(0, data.fortunes.length - 1)];
-    document.getElementById('dailyFortune').textContent = randomFortune;
+    let reading;
+    try {
+        reading = await fetchFortune(sign);
+    } catch (error) {
+        document.getElementById('dailyFortune').textContent = error.message;
+        return;
+    }
+    
+    document.getElementById('dailyFortune').textContent = reading.fortune;
     
-    const energy = generateEnergyLevels();
+    const energy = reading.energy;
     setTimeout(() => {
         document.getElementById('loveMeter').style.width = energy.love + '%';
         document.getElementById('careerMeter').style.width = energy.career + '%';
@@ -161,28 +154,25 @@ function displayFortune(sign) {
         document.getElementById('financeMeter').style.width = energy.finance + '%';
     }, 100);
     
-    const luckyNumbers = generateLuckyNumbers();
     const luckyNumbersContainer = document.getElementById('luckyNumbers');
     luckyNumbersContainer.innerHTML = '';
-    luckyNumbers.forEach(num => {
+    reading.luckyNumbers.forEach(num => {
         const numberDiv = document.createElement('div');
         numberDiv.className = 'lucky-number';
         numberDiv.textContent = num;
         luckyNumbersContainer.appendChild(numberDiv);
     });
     
-    const randomColor = data.colors[randomInRange(0, data.colors.length - 1)];
+    const luckyColor = reading.luckyColor;
     document.getElementById('luckyColor').innerHTML = `
-        <div class="color-circle" style="background-color: ${randomColor.toLowerCase().replace(' ', '')}"></div>
-        <div class="color-name">${randomColor}</div>
+        <div class="color-circle" style="background-color: ${luckyColor.toLowerCase().replace(' ', '')}"></div>
+        <div class="color-name">${luckyColor}</div>
     `;
     
-    const compatibleSign = data.compatibleSigns[randomInRange(0, data.compatibleSigns.length - 1)];
     document.getElementById('compatibility').textContent = 
-        `Today you have excellent cosmic alignment with ${compatibleSign}. Connections with this sign may bring unexpected joy and mutual understanding.`;
+        `Today you have excellent cosmic alignment with ${reading.compatibleSign}. Connections with this sign may bring unexpected joy and mutual understanding.`;
     
-    const randomAdvice = adviceTemplates[randomInRange(0, adviceTemplates.length - 1)];
-    document.getElementById('advice').textContent = randomAdvice;
+    document.getElementById('advice').textContent = reading.advice;
     
     window.scrollTo(0, 0);
 }
@@ -204,19 +194,24 @@ function addMessage(content, isUser = false) {
     
     const contentDiv = document.createElement('div');
     contentDiv.className = 'message-content';
+    renderMessageContent(contentDiv, content);
+    
+    messageDiv.appendChild(avatar);
+    messageDiv.appendChild(contentDiv);
+    messagesContainer.appendChild(messageDiv);
     
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+    return contentDiv;
+}
+
+function renderMessageContent(contentDiv, content) {
+    contentDiv.innerHTML = '';
     const paragraphs = content.split('\n').filter(p => p.trim());
     paragraphs.forEach(paragraph => {
         const p = document.createElement('p');
         p.textContent = paragraph;
         contentDiv.appendChild(p);
     });
-    
-    messageDiv.appendChild(avatar);
-    messageDiv.appendChild(contentDiv);
-    messagesContainer.appendChild(messageDiv);
-    
-    messagesContainer.scrollTop = messagesContainer.scrollHeight;
 }
 
 function showTypingIndicator() {
@@ -258,6 +253,19 @@ function showError(message) {
     messagesContainer.scrollTop = messagesContainer.scrollHeight;
 }
 
+function parseSSEEvent(rawEvent) {
+    let event = 'message';
+    let data = '';
+    rawEvent.split('\n').forEach(line => {
+        if (line.startsWith('event:')) {
+            event = line.slice(6).trim();
+        } else if (line.startsWith('data:')) {
+            data += line.slice(5).trim();
+        }
+    });
+    return { event, data: data ? JSON.parse(data) : {} };
+}
+
 async function sendMessage(message) {
     const sendButton = document.getElementById('sendButton');
     const chatInput = document.getElementById('chatInput');
@@ -272,7 +280,7 @@ async function sendMessage(message) {
             chatSessionId = generateSessionId();
         }
         
-        const response = await fetch(`${API_BASE_URL}/chat`, {
+        const response = await fetch(`${API_BASE_URL}/chat/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -285,9 +293,8 @@ async function sendMessage(message) {
             })
         });
         
-        removeTypingIndicator();
-        
         if (!response.ok) {
+            removeTypingIndicator();
             if (response.status === 401) {
                 throw new Error('Session expired. Please login again.');
             }
@@ -295,9 +302,42 @@ async function sendMessage(message) {
             throw new Error(errorData.detail || 'Failed to get response');
         }
         
-        const data = await response.json();
-        chatSessionId = data.sessionId;
-        addMessage(data.response, false);
+        // Render tokens as they arrive
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        const messagesContainer = document.getElementById('chatMessages');
+        let buffer = '';
+        let reply = '';
+        let contentDiv = null;
+        
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            
+            buffer += decoder.decode(value, { stream: true });
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+            
+            for (const rawEvent of events) {
+                const { event, data } = parseSSEEvent(rawEvent);
+                
+                if (event === 'error') {
+                    throw new Error(data.detail || 'Failed to get response');
+                } else if (event === 'done') {
+                    chatSessionId = data.sessionId;
+                } else if (data.token) {
+                    if (!contentDiv) {
+                        removeTypingIndicator();
+                        contentDiv = addMessage('', false);
+                    }
+                    reply += data.token;
+                    renderMessageContent(contentDiv, reply);
+                    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+                }
+            }
+        }
+        
+        removeTypingIndicator();
         
     } catch (error) {
         removeTypingIndicator();
@@ -321,6 +361,29 @@ function handleSendMessage() {
     }
 }
 
+// Restore the latest conversation after a reload
+async function restoreChat() {
+    try {
+        const headers = { 'Authorization': `Bearer ${authToken}` };
+        const sessionsResponse = await fetch(`${API_BASE_URL}/sessions?limit=1`, { headers });
+        if (!sessionsResponse.ok) return;
+        const { sessions } = await sessionsResponse.json();
+        if (sessions.length === 0) return;
+        
+        const sessionId = sessions[0].sessionId;
+        const messagesResponse = await fetch(
+            `${API_BASE_URL}/sessions/${encodeURIComponent(sessionId)}/messages?limit=50`, { headers }
+        );
+        if (!messagesResponse.ok) return;
+        const { messages } = await messagesResponse.json();
+        
+        chatSessionId = sessionId;
+        messages.forEach(message => addMessage(message.content, message.role === 'user'));
+    } catch (error) {
+        console.error('Error restoring chat:', error);
+    }
+}
+
 async function clearChat() {
     if (!chatSessionId) return;
     
@@ -378,6 +441,7 @@ document.addEventListener('DOMContentLoaded', () => {
     // Check if user is already logged in
     if (loadAuth()) {
         showMainApp();
+        restoreChat();
     } else {
         showAuthSection();
     }
@@ -1,7 +1,8 @@
 #!/usr/bin/env python3
 """
 Main entry point for the Fortune Teller application.
-Run this file to start the server.
+Run this file to start the development server (auto-reload),
+or `python run.py --prod` for the multi-worker production server.
 """
 
 import sys
@@ -11,6 +12,11 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'backend'))
 
 if __name__ == "__main__":
+    if "--prod" in sys.argv:
+        from backend.launcher import main
+        main([arg for arg in sys.argv[1:] if arg != "--prod"])
+        sys.exit(0)
+    
     import uvicorn
     from dotenv import load_dotenv
     